@@ -3,6 +3,7 @@
 # Color support
 
 
+from collections import OrderedDict
 from math import floor, cos, sin, pi, sqrt, atan2  # last 5 for okhsl support
 
 
@@ -22,7 +23,15 @@ class Color(object):
 
     Note:
         Will change Black or White primary colors slightly so highlight/shadow colors are visibly different.
+        Colors from the ColorCache, which includes the colors of threads in a Draft, are shared
+        and frozen: setting rgb, hex, shadeable, highlight, shadow or as_drawn on them raises
+        AttributeError. Assign a new color to the thread instead.
+        Only frozen Colors are hashable, as the rgb of other Colors can change.
     """
+    _frozen = False
+    # attributes that can't be set on a frozen Color
+    _fixed = ('rgb', 'shadeable', 'hex', 'highlight', 'shadow', 'as_drawn')
+
     def __init__(self, rgb_or_hex="#000000", shadeable=False):
         self.shadeable = shadeable
         # initialise self.rgb
@@ -35,19 +44,20 @@ class Color(object):
             self.rgb = tuple(rgb_or_hex)
         else:
             self.rgb = rgb_or_hex
-        # as_drawn may be adjusted to show shading
-        # - used by renderer in drawdown,weft,warp
-        self.as_drawn = self.rgb
-        # initialise self.hsl
-        self.hsl = self.rgb2hsl(self.rgb)
-        # initialise okhsl
-        self.okhsl = self.rgb2okhsl(self.rgb)
-        # initialise self.highlight, self.shadow
-        self.highlight = self.create_highlight(self.rgb)
-        self.shadow = self.create_shadow(self.rgb)
-        # Check if as_drawn needs to be changed
-        if self.shadeable:
-            self.check_self_shadeable()
+        # hsl, okhsl, highlight, shadow and as_drawn are computed on first use
+        self._reset()
+
+    def __setattr__(self, name, value):
+        if self._frozen and name in self._fixed:
+            raise AttributeError("can't change a shared Color, assign a new color to the thread instead")
+        object.__setattr__(self, name, value)
+
+    @property
+    def frozen(self):
+        """
+        bool: True for a shared Color from the ColorCache, which can't be changed.
+        """
+        return self._frozen
 
     def __str__(self):
         return str(self.rgb)
@@ -61,6 +71,11 @@ class Color(object):
     def __ne__(self, other):
         return self.rgb != other.rgb
 
+    def __hash__(self):
+        if not self._frozen:
+            raise TypeError("unhashable type: 'Color' (only shared Colors from the ColorCache are hashable)")
+        return hash(self.rgb)
+
     def close(self, other, distance=60):
         """
         True if two colors are close to each other usng RGB distance.
@@ -190,12 +205,12 @@ class Color(object):
         """
         if self.highlight == self.rgb:
             # can't see highlight so replace as_drawn colour with darker
-            self.as_drawn = self.create_shadow(self.rgb, 0.93)
-            self.highlight = (255, 255, 255)
+            self._as_drawn = self.create_shadow(self.rgb, 0.93)
+            self._highlight = (255, 255, 255)
         if self.shadow == self.rgb:
             # can't see shadow so replace as_drawn colour with brighter
-            self.as_drawn = self.create_highlight(self.rgb, 1.1)
-            self.shadow = (0, 0, 0)
+            self._as_drawn = self.create_highlight(self.rgb, 1.1)
+            self._shadow = (0, 0, 0)
 
     @property
     def css(self):
@@ -237,13 +252,161 @@ class Color(object):
     def hex(self, hexstring):
         h = hexstring.lstrip('#')
         self.rgb = tuple(int(h[i:i+2], 16) for i in (0, 2, 4))
-        self.hsl = self.rgb2hsl(self.rgb)
-        self.okhsl = self.rgb2okhsl(self.rgb)
-        self.highlight = self.create_highlight(self.rgb)
-        self.shadow = self.create_shadow(self.rgb)
+        self._reset()
+
+    def _reset(self):
+        " forget the derived colors so they are recomputed from rgb when next used "
+        self._hsl = None
+        self._okhsl = None
+        self._highlight = None
+        self._shadow = None
+        self._as_drawn = None
+
+    def _shade(self):
+        " compute highlight, shadow and as_drawn together as check_self_shadeable relates them "
+        self._highlight = self.create_highlight(self.rgb)
+        self._shadow = self.create_shadow(self.rgb)
+        # as_drawn may be adjusted to show shading
+        # - used by renderer in drawdown,weft,warp
+        self._as_drawn = self.rgb
+        # Check if as_drawn needs to be changed
         if self.shadeable:
             self.check_self_shadeable()
 
+    @property
+    def hsl(self):
+        """
+        tuple: HSL of this color. Range 0 to 1
+        """
+        if self._hsl is None:
+            self._hsl = self.rgb2hsl(self.rgb)
+        return self._hsl
+
+    @property
+    def okhsl(self):
+        """
+        list: OKHSL of this color. Range 0 to 1
+        """
+        if self._okhsl is None:
+            self._okhsl = self.rgb2okhsl(self.rgb)
+        return self._okhsl
+
+    @property
+    def highlight(self):
+        """
+        RGB tuple: A brighter version of this color, used for shading.
+        """
+        if self._highlight is None:
+            self._shade()
+        return self._highlight
+
+    @highlight.setter
+    def highlight(self, rgb):
+        if self._highlight is None:
+            self._shade()
+        self._highlight = rgb
+
+    @property
+    def shadow(self):
+        """
+        RGB tuple: A dimmer version of this color, used for shading.
+        """
+        if self._shadow is None:
+            self._shade()
+        return self._shadow
+
+    @shadow.setter
+    def shadow(self, rgb):
+        if self._shadow is None:
+            self._shade()
+        self._shadow = rgb
+
+    @property
+    def as_drawn(self):
+        """
+        RGB tuple: The color used when drawing. May differ from rgb if shadeable.
+        """
+        if self._as_drawn is None:
+            self._shade()
+        return self._as_drawn
+
+    @as_drawn.setter
+    def as_drawn(self, rgb):
+        if self._as_drawn is None:
+            self._shade()
+        self._as_drawn = rgb
+
+
+class ColorCache(object):
+    """
+    A flyweight store of Colors. Identical colors share one Color instance.
+     - Keyed by (rgb, shadeable) as shadeable Colors may be drawn differently.
+     - Holds at most maxsize Colors, dropping the least recently used. A dropped Color
+       stays valid wherever it is used, a later get() just makes a new one.
+     - hits and misses count lookups, for profiling.
+     - Shared Colors are frozen, changing one raises AttributeError.
+
+    Args:
+        maxsize (int, optional): most Colors to keep.
+
+    Examples:
+        >>> color_cache.get('#ff0000', True) is color_cache.get((255, 0, 0), True)
+        True
+    """
+    def __init__(self, maxsize=4096):
+        self._colors = OrderedDict()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._colors)
+
+    def __repr__(self):
+        return "<ColorCache: %d colors, %d hits, %d misses>" % (len(self._colors), self.hits, self.misses)
+
+    def get(self, rgb_or_hex, shadeable=False):
+        """
+        Return the shared Color for this value, creating it on first use.
+
+        Args:
+            rgb_or_hex (Color, tuple, str): Color, or RGB tuple, or hex string
+            shadeable (bool, optional): as for Color.
+        Returns:
+            Color:
+        """
+        if isinstance(rgb_or_hex, Color):
+            rgb = rgb_or_hex.rgb
+        elif isinstance(rgb_or_hex, type("")):
+            h = rgb_or_hex.lstrip('#')
+            rgb = tuple(int(h[i:i+2], 16) for i in (0, 2, 4))
+        else:
+            rgb = tuple(rgb_or_hex)
+        key = (rgb, shadeable)
+        color = self._colors.get(key)
+        if color is None:
+            self.misses += 1
+            color = self._colors[key] = Color(rgb, shadeable)
+            color._frozen = True
+            if len(self._colors) > self.maxsize:
+                self._colors.popitem(last=False)
+        else:
+            self.hits += 1
+            self._colors.move_to_end(key)
+        return color
+
+    def clear(self):
+        """
+        Forget all the Colors and reset the counters.
+        """
+        self._colors.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+color_cache = ColorCache()
+"""ColorCache: The shared cache used by Drafts and generators."""
+
 # ----------------------------------------------
 # srgb_to_okhsl, rgb = okhsl_to_srgb
 # derived from Björn Ottosson
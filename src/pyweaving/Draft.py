@@ -4,29 +4,165 @@
 
 
 import datetime
+import hashlib
 import json
-from copy import deepcopy
-from collections import defaultdict
+from array import array
 
-from .Color import Color
+import numpy as np
 
+from .Color import Color, color_cache
+from .sequences import RunSequence
 
-class WarpThread(object):
+
+NO_COLOR = 0xFFFF
+"""int: Palette index stored for a thread without a Color."""
+
+
+def _mask_column(bits):
+    " storage for bit masks over shafts or treadles. Packed uint64 if they fit, else Python ints "
+    return array('Q') if bits <= 64 else []
+
+
+def _to_mask(items, lookup):
+    " bit mask of items (objects or zero based indices) using lookup to find the index of objects "
+    mask = 0
+    for item in items:
+        mask |= 1 << (int(item) if isinstance(item, (int, np.integer)) else lookup[item])
+    return mask
+
+
+def _from_mask(mask, items):
+    " set of the items selected by the bits in mask "
+    found = set()
+    i = 0
+    while mask:
+        if mask & 1:
+            found.add(items[i])
+        mask >>= 1
+        i += 1
+    return found
+
+
+def _mask_matrix(column, width):
+    " expand a column of bit masks into a boolean array (len(column) x width) "
+    if isinstance(column, array):
+        masks = _column_array(column, np.uint64)
+        bits = np.arange(width, dtype=np.uint64)
+        return ((masks[:, None] >> bits) & np.uint64(1)).astype(bool)
+    matrix = np.zeros((len(column), width), dtype=bool)
+    for row, mask in enumerate(column):
+        matrix[row, [bit for bit in range(width) if mask >> bit & 1]] = True
+    return matrix
+
+
+def _column_array(column, dtype):
+    " numpy view of an array.array column (copy of a list column) "
+    if isinstance(column, array):
+        return np.frombuffer(column, dtype=dtype) if len(column) else np.zeros(0, dtype=dtype)
+    return np.array(column, dtype=dtype)
+
+
+def _matrix_column(matrix):
+    " column of bit masks from a boolean array (rows x bits), the inverse of _mask_matrix() "
+    column = _mask_column(matrix.shape[1])
+    if isinstance(column, array):
+        bits = np.left_shift(np.uint64(1), np.arange(matrix.shape[1], dtype=np.uint64))
+        column.frombytes((matrix * bits).sum(axis=1, dtype=np.uint64).tobytes())
+    else:
+        column.extend(_to_mask(np.flatnonzero(row), None) for row in matrix)
+    return column
+
+
+def _classes(matrix):
     """
-    Represents a single warp thread. Its Color, Spacing, and which Shaft it is on.
+    Equivalence class of each column of a boolean array, equal columns sharing one.
+    Classes are numbered in order of first appearance, found by hashing the packed columns.
+    """
+    packed = np.ascontiguousarray(np.packbits(matrix, axis=0).T)
+    classes = {}
+    return np.array([classes.setdefault(column.tobytes(), len(classes)) for column in packed], dtype=np.intp)
 
-    Args:
-        color (Color|RGB tuple|hexstring): Thread color
-        shaft (Shaft): Shaft this thread is on,
-        spacing (float): size of spacing of this thread.
+
+def _merge_classes(treadling, tieup, classes):
+    " treadling (picks x treadles) and tieup (treadles x shafts) with each class of treadles made one "
+    members = np.eye(classes.max() + 1 if len(classes) else 0, dtype=np.intp)[classes]
+    return (treadling @ members) > 0, (members.T @ tieup) > 0
+
+
+def _spaced(column):
+    " boolean array, True where a spacing column holds a non zero size "
+    spacing = _column_array(column, np.float32)
+    return ~np.isnan(spacing) & (spacing != 0)
+
+
+def _run_length_encode(values):
+    " {'values', 'counts'} runs of a column for Draft.to_json(run_length=True) "
+    runs = {'values': [], 'counts': []}
+    last = object()
+    for value in values:
+        if value == last:
+            runs['counts'][-1] += 1
+        else:
+            runs['values'].append(value)
+            runs['counts'].append(1)
+            last = value
+    return runs
+
+
+def _decode_column(column):
+    " a column from Draft.to_json(), as a list "
+    if isinstance(column, dict):
+        values = []
+        for value, count in zip(column['values'], column['counts']):
+            values.extend([value] * count)
+        return values
+    return column
+
+
+def _from_float32(value):
+    " spacing as stored (float32, nan for None) back to a Python float "
+    if value != value:  # nan
+        return None
+    return float('%.7g' % value)
+
+
+class _Thread(object):
     """
-    def __init__(self, color=None, shaft=None, spacing=None):
+    Common parts of WarpThread and WeftThread. A thread is either standalone,
+    holding its own values, or a view onto row _index of its Draft's columns.
+    """
+    __slots__ = ('_draft', '_index', '_color', '_spacing', '_yarn_width', '_css_hash')
+    _axis = None
+
+    def _init(self, color, spacing):
+        self._draft = None
+        self._index = None
         if color and not isinstance(color, Color):
-            color = Color(color, True)
+            color = color_cache.get(color, True)
         self._color = color
-        self.shaft = shaft
-        self.spacing = spacing
-        self.css_label = None  # for SVG styles
+        self._spacing = spacing
+        self._yarn_width = None
+        self._css_hash = None
+
+    @classmethod
+    def _view(cls, draft, index):
+        " a thread backed by row index of the draft's columns "
+        thread = cls.__new__(cls)
+        thread._draft = draft
+        thread._index = index
+        return thread
+
+    def _columns(self):
+        return getattr(self._draft, '_' + self._axis)
+
+    def _row(self):
+        " row of the Draft's columns holding this thread, shared by each virtual repeat "
+        return self._index % len(self._columns()['color'])
+
+    def _write_row(self):
+        " row to change for this thread alone, expanding any virtual repeats first "
+        self._draft._materialize(self._axis)
+        return self._index
 
     @property
     def color(self):
@@ -36,38 +172,199 @@ class WarpThread(object):
         Args:
         color (Color):
         """
-        return self._color
+        if self._draft is None:
+            return self._color
+        index = self._columns()['color'][self._row()]
+        return None if index == NO_COLOR else self._draft.palette[index]
 
     @color.setter
     def color(self, color):
-        if color and not isinstance(color, Color):
-            color = Color(color, True)
-        # print("setter method called", color)
-        self._color = color
+        if self._draft is None:
+            if color and not isinstance(color, Color):
+                color = color_cache.get(color, True)
+            self._color = color
+        else:
+            row = self._write_row()
+            self._draft._column(self._axis, 'color')[row] = self._draft._color_index(color)
+            self._draft._touch()
+
+    @property
+    def spacing(self):
+        """
+        float: size of spacing of this thread, or None.
+        """
+        if self._draft is None:
+            return self._spacing
+        return _from_float32(self._columns()['spacing'][self._row()])
+
+    @spacing.setter
+    def spacing(self, spacing):
+        if self._draft is None:
+            self._spacing = spacing
+        else:
+            row = self._write_row()
+            self._draft._column(self._axis, 'spacing')[row] = float('nan') if spacing is None else spacing
+            self._draft._position_index = None
+            self._draft._touch()
+
+    @property
+    def yarn_width(self):
+        """
+        Drawn width of this thread. Set by the renderer's calculate_box_sizing().
+        """
+        if self._draft is None:
+            return self._yarn_width
+        column = self._columns().get('yarn_width')
+        return column[self._row()] if column is not None else None
+
+    @yarn_width.setter
+    def yarn_width(self, width):
+        if self._draft is None:
+            self._yarn_width = width
+        else:
+            # same for every repeat, like css_hash
+            self._draft._column(self._axis, 'yarn_width')[self._row()] = width
+            self._draft._position_index = None
+
+    @property
+    def css_hash(self):
+        """
+        Index of this thread's color/spacing in the SVG css labels. Set by assign_all_css_labels() when first used.
+        """
+        if self._draft is None:
+            return self._css_hash
+        if 'css_colors' not in self._draft._derived:
+            self._draft.assign_all_css_labels()
+        column = self._columns().get('css_hash')
+        if column is None or column[self._row()] < 0:
+            return None
+        return column[self._row()]
+
+    @css_hash.setter
+    def css_hash(self, value):
+        if self._draft is None:
+            self._css_hash = value
+        else:
+            self._draft._column(self._axis, 'css_hash')[self._row()] = -1 if value is None else value
+
+    @property
+    def css_label(self):
+        """
+        str: Name of the css style used for this thread in SVG output.
+        """
+        css_hash = self.css_hash
+        return None if css_hash is None else "%scol%d" % (self._axis, css_hash)
+
+    def __eq__(self, other):
+        if self._draft is None or not isinstance(other, type(self)):
+            return self is other
+        return self._draft is other._draft and self._index == other._index
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        if self._draft is None:
+            return id(self)
+        return hash((id(self._draft), self._axis, self._index))
+
+
+class WarpThread(_Thread):
+    """
+    Represents a single warp thread. Its Color, Spacing, and which Shaft it is on.
+
+    Threads in a Draft are lightweight views onto the Draft's columnar storage and
+    are created on demand by iterating or indexing ``draft.warp``.
+    A WarpThread created directly holds its own values until appended to a Draft.
+
+    Args:
+        color (Color|RGB tuple|hexstring): Thread color
+        shaft (Shaft): Shaft this thread is on,
+        spacing (float): size of spacing of this thread.
+    """
+    __slots__ = ('_shaft',)
+    _axis = 'warp'
+
+    def __init__(self, color=None, shaft=None, spacing=None):
+        self._init(color, spacing)
+        self._shaft = shaft
+
+    @property
+    def shaft(self):
+        """
+        Shaft: The Shaft this thread is on.
+        """
+        if self._draft is None:
+            return self._shaft
+        index = self._draft._warp['shaft'][self._row()]
+        return None if index < 0 else self._draft.shafts[index]
+
+    @shaft.setter
+    def shaft(self, shaft):
+        if self._draft is None:
+            self._shaft = shaft
+        else:
+            row = self._write_row()
+            self._draft._column('warp', 'shaft')[row] = self._draft._shaft_index(shaft)
+            self._draft.mark_dirty('warp', self._index, self._index + 1)
 
     def __repr__(self):
         return '<WarpThread color:%s shaft:%s>' % (self.color.rgb, self.shaft)
 
 
-class WeftThread(object):
+class WeftThread(_Thread):
     """
     Represents a single weft thread. Has Shaft or Treadle depending
     on whether draft is only a Liftplan and has no Treadles.
 
+    Threads in a Draft are lightweight views onto the Draft's columnar storage,
+    with the shafts and treadles held as bit masks.
+
     Args:
         color (Color|RGB tuple|hexstring): Thread color
         shafts (list of Shaft): If Liftplan only the Shafts this thread is on else None.
         treadles (list of Treadle): Treadles this weft thread is driven by.
         spacing (float): size of spacing of this thread.
     """
+    __slots__ = ('_shafts', '_treadles')
+    _axis = 'weft'
+
     def __init__(self, color=None, shafts=None, treadles=None, spacing=None):
-        if color and not isinstance(color, Color):
-            color = Color(color, True)
-        self._color = color
-        self.treadles = treadles or set()   # has treadles if not liftplan
-        self.shafts = shafts or set()       # has shafts if a liftplan
-        self.spacing = spacing
-        self.css_label = None  # for SVG styles
+        self._init(color, spacing)
+        self._treadles = treadles or set()   # has treadles if not liftplan
+        self._shafts = shafts or set()       # has shafts if a liftplan
+
+    @property
+    def shafts(self):
+        """
+        set of Shaft: If Liftplan the Shafts this thread is on.
+        """
+        if self._draft is None:
+            return self._shafts
+        return _from_mask(self._draft._weft['shafts'][self._row()], self._draft.shafts)
+
+    @shafts.setter
+    def shafts(self, shafts):
+        if self._draft is None:
+            self._shafts = shafts
+        else:
+            self._draft._set_mask('shafts', self._write_row(), _to_mask(shafts or (), self._draft._lookup()))
+
+    @property
+    def treadles(self):
+        """
+        set of Treadle: Treadles this weft thread is driven by.
+        """
+        if self._draft is None:
+            return self._treadles
+        return _from_mask(self._draft._weft['treadles'][self._row()], self._draft.treadles)
+
+    @treadles.setter
+    def treadles(self, treadles):
+        if self._draft is None:
+            self._treadles = treadles
+        else:
+            self._draft._set_mask('treadles', self._write_row(), _to_mask(treadles or (), self._draft._lookup()))
 
     @property
     def connected_shafts(self):
@@ -75,8 +372,11 @@ class WeftThread(object):
         The shafts that this weft thread affects. Drawn from Shafts if only a liftplan is described.
         Drawn from Treadles if Treadling defined.
         """
-        if self.shafts:
-            return self.shafts
+        if self._draft is not None:
+            return _from_mask(self.connected_mask, self._draft.shafts)
+        shafts = self.shafts
+        if shafts:
+            return shafts
         else:
             # assert self.treadles #!!
             ret = set()
@@ -85,20 +385,15 @@ class WeftThread(object):
             return ret
 
     @property
-    def color(self):
+    def connected_mask(self):
         """
-        Color of this thread
-
-        Args:
-        color (Color):
+        int: connected_shafts as a bit mask, bit 0 for the first Shaft.
         """
-        return self._color
-
-    @color.setter
-    def color(self, color):
-        if color and not isinstance(color, Color):
-            color = Color(color, True)
-        self._color = color
+        if self._draft is None:
+            return _to_mask([shaft.index - 1 for shaft in self.connected_shafts], None)
+        draft = self._draft
+        row = self._row()
+        return _lift_mask(draft._weft['shafts'][row], draft._weft['treadles'][row], draft.tieup_masks())
 
     def __repr__(self):
         if self.treadles:
@@ -109,6 +404,96 @@ class WeftThread(object):
                                                         self.shafts)
 
 
+class ThreadList(object):
+    """
+    The warp or weft of a Draft. Behaves like a list of WarpThread or WeftThread,
+    creating lightweight thread views onto the Draft's columns as they are accessed.
+     - With virtual repeats (Draft.repeat(n, virtual=True)) the columns hold one repeat
+       and every repeat's threads are views onto it.
+
+    Args:
+        draft (Draft): owning Draft,
+        cls (WarpThread | WeftThread): type of thread view to create.
+    """
+    __slots__ = ('_draft', '_cls')
+
+    def __init__(self, draft, cls):
+        self._draft = draft
+        self._cls = cls
+
+    def _columns(self):
+        return getattr(self._draft, '_' + self._cls._axis)
+
+    def __len__(self):
+        return len(self._columns()['color']) * self._draft._repeats[self._cls._axis]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._cls._view(self._draft, i) for i in range(*index.indices(len(self)))]
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("thread index out of range")
+        return self._cls._view(self._draft, index)
+
+    def __iter__(self):
+        view = self._cls._view
+        for i in range(len(self)):
+            yield view(self._draft, i)
+
+    def __reversed__(self):
+        view = self._cls._view
+        for i in range(len(self) - 1, -1, -1):
+            yield view(self._draft, i)
+
+    def __contains__(self, thread):
+        return isinstance(thread, self._cls) and thread._draft is self._draft and thread._index < len(self)
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __repr__(self):
+        return '<%s list of %d>' % (self._cls.__name__, len(self))
+
+    def index(self, thread):
+        """
+        Position of thread in this list.
+        """
+        if thread in self:
+            return thread._index
+        raise ValueError("%r is not in list" % (thread,))
+
+    def append(self, thread):
+        """
+        Append a copy of thread (a standalone thread or a view from any Draft).
+        """
+        self._draft._materialize(self._cls._axis)
+        if self._cls is WarpThread:
+            self._draft._append_thread('warp', thread.color, thread.spacing, shaft=thread.shaft)
+        else:
+            self._draft._append_thread('weft', thread.color, thread.spacing,
+                                       shafts=thread.shafts, treadles=thread.treadles)
+
+    def reverse(self):
+        """
+        Reverse the order of the threads in place.
+         - Reversing one virtual repeat reverses them all.
+        """
+        for name in list(self._columns()):
+            self._draft._column(self._cls._axis, name).reverse()
+        self._draft.invalidate_drawdown()
+
+    def clear(self):
+        """
+        Remove all threads.
+        """
+        for name in list(self._columns()):
+            del self._draft._column(self._cls._axis, name)[:]
+        self._draft._repeats[self._cls._axis] = 1
+        self._draft.invalidate_drawdown()
+
+
 class Shaft(object):
     """
     Represents a single shaft of the loom.
@@ -123,22 +508,400 @@ class Shaft(object):
         return '<Shaft %d>' % (self.index)
 
 
+class ShaftSet(set):
+    """
+    The set of Shafts tied to a Treadle. Keeps the Treadle's shaft bit mask
+    up to date as it is changed.
+
+    Args:
+        treadle (Treadle): owner of this set,
+        shafts (iterable of Shaft, optional): initial contents.
+    """
+    __slots__ = ('_treadle',)
+
+    def __init__(self, treadle, shafts=()):
+        set.__init__(self, shafts)
+        self._treadle = treadle
+
+    def __reduce__(self):
+        return (ShaftSet, (self._treadle, list(self)))
+
+
+def _updating(name):
+    " wrap set method name to update the owning Treadle's mask afterwards "
+    method = getattr(set, name)
+
+    def update(self, *args):
+        result = method(self, *args)
+        self._treadle._update_mask()
+        return result
+    update.__name__ = name
+    update.__doc__ = method.__doc__
+    return update
+
+
+for _name in ('add', 'discard', 'remove', 'pop', 'clear', 'update', 'difference_update',
+              'intersection_update', 'symmetric_difference_update',
+              '__ior__', '__iand__', '__isub__', '__ixor__'):
+    setattr(ShaftSet, _name, _updating(_name))
+del _name
+
+
 class Treadle(object):
     """
     Represents a single treadle of the loom.
+     - mask has bit i set for each Shaft in shafts, where i is the Shaft's position
+       in the Draft's shafts (index - 1 for a Treadle outside a Draft).
 
     Args:
         index (int): 1 based index of this Treadle on the loom.
         shafts (list of Shaft): The Shafts this treadle affects.
+        draft (Draft, optional): Draft whose shafts these are.
     """
-    def __init__(self, index, shafts=None):
+    def __init__(self, index, shafts=None, draft=None):
+        self.draft = draft
         self.shafts = shafts or set()
         self.index = index
 
+    @property
+    def shafts(self):
+        """
+        ShaftSet: The Shafts this treadle affects.
+        """
+        return self._shafts
+
+    @shafts.setter
+    def shafts(self, shafts):
+        self._shafts = ShaftSet(self, shafts)
+        self._update_mask()
+
+    def _update_mask(self):
+        " forget the mask, it is rebuilt from the shafts' positions when next used "
+        self._mask = None
+
+    def _position_mask(self, lookup):
+        " shaft bit mask using lookup (Draft._lookup()) for the shafts' positions "
+        if self._mask is None or self._mask[0] is not lookup:
+            if lookup is None:
+                mask = _to_mask([shaft.index - 1 for shaft in self._shafts], None)
+            else:
+                mask = _to_mask(self._shafts, lookup)
+            self._mask = (lookup, mask)
+        return self._mask[1]
+
+    @property
+    def mask(self):
+        """
+        int: bit mask of the shafts this treadle affects.
+        """
+        return self._position_mask(None if self.draft is None else self.draft._lookup())
+
     def __repr__(self):
         return '<Treadle %d, using shafts %s>' % (self.index, sorted([s.index for s in self.shafts]))
 
 
+def _lift_mask(shafts, treadles, tieup):
+    " shaft mask of a pick: its liftplan shafts, else the tieup masks of its treadles ORed together "
+    if shafts:
+        return shafts
+    i = 0
+    while treadles:
+        if treadles & 1:
+            shafts |= tieup[i]
+        treadles >>= 1
+        i += 1
+    return shafts
+
+
+def _run_starts(values):
+    " bool array marking the first cell of each run along the rows of a 2D boolean array "
+    starts = np.empty(values.shape, dtype=bool)
+    starts[:, :1] = True
+    np.not_equal(values[:, 1:], values[:, :-1], out=starts[:, 1:])
+    return starts
+
+
+def _pack(bits):
+    " pack rows of bits into bytes, the first position in the low bit "
+    return np.packbits(bits, axis=1, bitorder='little')
+
+
+class _RunIndex(object):
+    """
+    The runs along every thread of one axis, held by position: a packed bitmap
+    (threads x positions) marking the cell each run starts on, and the value of each
+    thread's first cell. Values alternate from run to run along a thread, so that
+    is enough to list them, and changing a few cells only rewrites the bits beside them.
+
+    Updates return a copy so the Floats made from an older index stay as they were.
+
+    Args:
+        values (numpy.ndarray): bool, threads x positions (a view is fine),
+        invert (bool, optional): runs are visible where values are False.
+    """
+    def __init__(self, values, invert=False):
+        self.shape = values.shape
+        self.invert = invert
+        self.first = values[:, 0].copy() if values.shape[1] else np.zeros(len(values), dtype=bool)
+        self.packed = _pack(_run_starts(values))
+
+    def _copy(self):
+        index = _RunIndex.__new__(_RunIndex)
+        index.shape = self.shape
+        index.invert = self.invert
+        index.first = self.first.copy()
+        index.packed = self.packed.copy()
+        return index
+
+    def rows(self, start, stop, values):
+        """
+        Copy with threads start:stop re-encoded.
+
+        Args:
+            start, stop (int): range of changed threads,
+            values (numpy.ndarray): their new values, (stop - start) x positions.
+        """
+        index = self._copy()
+        index.packed[start:stop] = _pack(_run_starts(values))
+        if self.shape[1]:
+            index.first[start:stop] = values[:, 0]
+        return index
+
+    def columns(self, start, stop, values):
+        """
+        Copy with the runs of every thread re-encoded around positions start:stop,
+        which have changed. Only the bytes of the bitmap holding start..stop are rewritten,
+        as a changed cell can only start or end the runs either side of it.
+
+        Args:
+            start, stop (int): range of changed positions,
+            values (numpy.ndarray): all the new values, threads x positions.
+        """
+        index = self._copy()
+        length = self.shape[1]
+        low = start // 8 * 8
+        high = min((stop + 8) // 8 * 8, length)
+        if low >= high:
+            return index
+        # starting a cell early compares the first cell with the one before it
+        bits = _run_starts(values[:, max(low - 1, 0):high])
+        index.packed[:, low // 8:(high + 7) // 8] = _pack(bits[:, 1:] if low else bits)
+        if not low:
+            index.first = values[:, 0].copy()
+        return index
+
+    def runs(self):
+        """
+        Returns:
+            tuple of arrays: (thread, start, end, visible) for every run, sorted by thread
+            then start. start, end are inclusive.
+        """
+        threads, length = self.shape
+        if not threads or not length:
+            empty = np.zeros(0, dtype=np.intp)
+            return empty, empty, empty, np.zeros(0, dtype=bool)
+        bits = np.unpackbits(self.packed, axis=1, count=length, bitorder='little')
+        starts = np.flatnonzero(bits.view(bool))
+        # every thread starts a run, so each run ends just before the next one starts
+        ends = np.empty_like(starts)
+        ends[:-1] = starts[1:] - 1
+        ends[-1] = bits.size - 1
+        rows = np.arange(threads)
+        firsts = np.searchsorted(starts, rows * length)
+        counts = np.diff(np.append(firsts, len(starts)))
+        offset = np.repeat(rows * length, counts)
+        starts -= offset
+        ends -= offset
+        # runs alternate from the first cell's value
+        visible = (np.arange(len(starts)) - np.repeat(firsts, counts)) & 1
+        visible = visible.astype(bool) ^ np.repeat(self.first ^ self.invert, counts)
+        return np.repeat(rows, counts), starts, ends, visible
+
+
+def _clean():
+    " dirty state of a cache that is up to date "
+    return {'all': False, 'warp': None, 'weft': None}
+
+
+def _union(first, second):
+    " smallest (start, stop) range covering both, either may be None "
+    if first is None:
+        return second
+    if second is None:
+        return first
+    return min(first[0], second[0]), max(first[1], second[1])
+
+
+class Floats(object):
+    """
+    All the floats in a Draft held as parallel numpy arrays. Created by Draft.compute_float_arrays().
+
+     - axis: WARP (0) or WEFT (1),
+     - thread: index of the thread in draft.warp or draft.weft,
+     - start, end: first and last index along the thread (inclusive),
+     - visible: True if the float is on the front of the fabric,
+     - length: end - start (same convention as compute_floats).
+
+    Iterating yields the (start, end, visible, length, thread) tuples of compute_floats().
+
+    Args:
+        draft (Draft): the Draft these floats belong to.
+        axis, thread, start, end, visible (numpy.ndarray): parallel arrays, one entry per float.
+    """
+    WARP = 0
+    WEFT = 1
+
+    def __init__(self, draft, axis, thread, start, end, visible):
+        self.draft = draft
+        self._arrays = {'axis': axis, 'thread': thread, 'start': start, 'end': end, 'visible': visible}
+        self._runs = None
+        self._index = None
+
+    @classmethod
+    def _from_index(cls, draft, warp_index, weft_index):
+        " Floats from the _RunIndex of each axis, listed when first used "
+        floats = cls.__new__(cls)
+        floats.draft = draft
+        floats._arrays = None
+        floats._runs = None
+        floats._index = (warp_index, weft_index)
+        return floats
+
+    def _array(self, name):
+        if self._arrays is None:
+            warp_runs, weft_runs = self.runs(self.WARP), self.runs(self.WEFT)
+            arrays = [np.concatenate(pair) for pair in zip(warp_runs, weft_runs)]
+            arrays.insert(0, np.concatenate([np.full(len(warp_runs[0]), self.WARP, dtype=np.int8),
+                                             np.full(len(weft_runs[0]), self.WEFT, dtype=np.int8)]))
+            self._arrays = dict(zip(('axis', 'thread', 'start', 'end', 'visible'), arrays))
+        if name == 'length' and name not in self._arrays:
+            self._arrays['length'] = self._arrays['end'] - self._arrays['start']
+        return self._arrays[name]
+
+    axis = property(lambda self: self._array('axis'))
+    thread = property(lambda self: self._array('thread'))
+    start = property(lambda self: self._array('start'))
+    end = property(lambda self: self._array('end'))
+    visible = property(lambda self: self._array('visible'))
+    length = property(lambda self: self._array('length'))
+
+    def runs(self, axis):
+        """
+        The (thread, start, end, visible) arrays of the floats on one axis.
+
+        Args:
+            axis (int): Floats.WARP or Floats.WEFT.
+        """
+        if self._runs is None and self._index is not None:
+            self._runs = tuple(index.runs() for index in self._index)
+        elif self._runs is None:
+            on_warp = self.axis == self.WARP
+            names = ('thread', 'start', 'end', 'visible')
+            self._runs = (tuple(self._arrays[name][on_warp] for name in names),
+                          tuple(self._arrays[name][~on_warp] for name in names))
+        return self._runs[axis]
+
+    def __len__(self):
+        if self._arrays is None:
+            return len(self.runs(self.WARP)[0]) + len(self.runs(self.WEFT)[0])
+        return len(self._arrays['axis'])
+
+    def __iter__(self):
+        # one view per thread, shared by all of its floats
+        warp = list(self.draft.warp)
+        weft = list(self.draft.weft)
+        for axis, index, start, end, visible, length in zip(self.axis.tolist(), self.thread.tolist(),
+                                                            self.start.tolist(), self.end.tolist(),
+                                                            self.visible.tolist(), self.length.tolist()):
+            if axis == self.WARP:
+                yield (index, start), (index, end), visible, length, warp[index]
+            else:
+                yield (start, index), (end, index), visible, length, weft[index]
+
+    def __repr__(self):
+        return '<Floats warp:%d weft:%d>' % (np.count_nonzero(self.axis == self.WARP),
+                                             np.count_nonzero(self.axis == self.WEFT))
+
+    def select(self, axis=None, visible=None):
+        """
+        Return a new Floats holding only the floats on one axis and/or one side of the fabric.
+
+        Args:
+            axis (int, optional): Floats.WARP or Floats.WEFT,
+            visible (bool, optional): True for the front, False for the back.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if axis is not None:
+            mask &= self.axis == axis
+        if visible is not None:
+            mask &= self.visible == visible
+        return Floats(self.draft, self.axis[mask], self.thread[mask],
+                      self.start[mask], self.end[mask], self.visible[mask])
+
+
+class FloatSummary(object):
+    """
+    Summary of a Draft's floats, made in one pass over the float arrays. Created by Draft.float_summary.
+
+     - histogram(axis, visible): count of floats by the number of threads they cover,
+     - longest(axis, visible): longest float length (end - start), ignoring floats
+       as long as the warp as these are probably gaps in a gamp,
+     - warp_count, weft_count: threads visible on the front, warp_ratio: their balance,
+     - selvedge_floats: lengths of all the floats on the first and last warp threads.
+
+    Args:
+        floats (Floats): from Draft.computed_floats,
+        num_warp (int): number of warp threads in the Draft.
+    """
+    def __init__(self, floats, num_warp):
+        self.floats = floats
+        lengths = floats.length
+        size = int(lengths.max()) + 2 if len(lengths) else 1
+        # one bincount over (axis, visible, length) gives everything but the selvedges
+        group = floats.axis.astype(np.intp) * 2 + floats.visible
+        self._histograms = np.bincount(group * size + lengths + 1, minlength=4 * size).reshape(4, size)
+        self._gap = num_warp  # histogram bin of floats as long as the warp
+        covered = np.arange(size)
+        self.warp_count = int(self.histogram(Floats.WARP) @ covered)
+        self.weft_count = int(self.histogram(Floats.WEFT) @ covered)
+        self.warp_ratio = self.warp_count / max(self.weft_count, 1)  # !! twill error if badly formed floaty wif
+        # Floating Selvedges required ?
+        thread, start, end, visible = floats.runs(Floats.WARP)
+        first, last = np.searchsorted(thread, [1, num_warp - 1])
+        edges = np.r_[0:first, last:len(thread)] if num_warp > 1 else np.arange(len(thread))
+        self.selvedge_floats = (end[edges] - start[edges]).tolist()
+
+    def __repr__(self):
+        return '<FloatSummary warp:%d/%d weft:%d/%d>' % (self.longest(Floats.WARP), self.longest(Floats.WARP, False),
+                                                         self.longest(Floats.WEFT), self.longest(Floats.WEFT, False))
+
+    def histogram(self, axis, visible=True):
+        """
+        Count of floats by the number of threads they cover (index 1 is a single thread).
+
+        Args:
+            axis (int): Floats.WARP or Floats.WEFT,
+            visible (bool, optional): True for the front, False for the back.
+        Returns:
+            numpy.ndarray: of counts.
+        """
+        return self._histograms[axis * 2 + bool(visible)]
+
+    def longest(self, axis, visible=True):
+        """
+        Longest float (end - start) on one axis and side, 0 if none.
+
+        Args:
+            axis (int): Floats.WARP or Floats.WEFT,
+            visible (bool, optional): True for the front, False for the back.
+        """
+        counts = self.histogram(axis, visible).copy()
+        if self._gap < len(counts):
+            counts[self._gap] = 0
+        found = np.flatnonzero(counts)
+        return int(found[-1]) - 1 if len(found) else 0
+
+
 class DraftError(Exception):
     pass
 
@@ -179,23 +942,30 @@ class Draft(object):
 
         self.treadles = []
         for i in range(num_treadles):
-            self.treadles.append(Treadle(i+1))
-
-        self.warp = []  # holds the WarpThreads
-        self.weft = []  # holds the WeftThreads
-        # unique yarn spacing,color stats from gather_metrics()
-        self.thread_stats = {"weft": [],             # list of (colour,spacing,count)
-                             "warp": [],             # list of (colour,spacing,count)
-                             "warp_spacings": [],    # list of (spacing,count)
-                             "weft_spacings": [],    # list of (spacing,count)
-                             "summary": [],          # list of spacings
-                             "warp_ratio": [],       # value of Warp/Weft balance
-                             "unique_threads":  [],  # number of unique threads used in draft
-                             "selvedge_floats": [],  # list of lengths of warp threads on sides
-                             }
-
-        # css labels for svg
-        self.css_colors = []
+            self.treadles.append(Treadle(i+1, draft=self))
+
+        # Threads are stored in columns, draft.warp and draft.weft are views of them
+        self.palette = []  # unique Colors used by threads, indexed by the color columns
+        self._palette_lookup = {}  # (rgb, shadeable) to palette index
+        self._warp = {'color': array('H'),    # palette index (NO_COLOR for None)
+                      'spacing': array('f'),  # nan for None
+                      'shaft': array('h'),    # index into self.shafts (-1 for None)
+                      }
+        self._weft = {'color': array('H'),
+                      'spacing': array('f'),
+                      'shafts': _mask_column(num_shafts),      # bit mask of liftplan shafts
+                      'treadles': _mask_column(num_treadles),  # bit mask of treadles
+                      }
+        # virtual repeats, the columns hold one repeat of each axis
+        self._repeats = {'warp': 1, 'weft': 1}
+        # (axis, name) of columns, and 'palette', shared with copies. Copied before changing
+        self._shared = set()
+        self._lookup_cache = {}
+        self._warp_list = ThreadList(self, WarpThread)
+        self._weft_list = ThreadList(self, WeftThread)
+        # computed_floats, thread_counts, thread_stats, css_colors and collected_notes.
+        # - computed when first used, discarded by invalidate_derived()
+        self._derived = {}
 
         self.warp_units = warp_units
         self.weft_units = weft_units
@@ -211,19 +981,288 @@ class Draft(object):
         self.telephone = telephone
         self.fax = fax
         self.notes = notes
-        self.collected_notes = []
         self.draft_title = []  # multiple line of title from wif and filename
 
         self.source_program = None  # "PyWeaving" #! set when saving
         self.source_version = None  # __version__
 
+        # cached lift and drawdown matrices from compute_drawdown_matrix()
+        self._drawdown_matrix = None
+        # incremented by every change to the draft
+        self.mutation_count = 0
+        # thread ranges changed since each cache ('matrix', 'floats') was brought up to date
+        self._dirty = {}
+        # cumulative yarn widths from build_position_index()
+        self._position_index = None
+
+    @property
+    def warp(self):
+        """
+        ThreadList: The WarpThreads of this draft.
+        """
+        return self._warp_list
+
+    @warp.setter
+    def warp(self, threads):
+        # copy first, they may be views of our own columns
+        threads = [WarpThread(thread.color, thread.shaft, thread.spacing) for thread in threads]
+        self._warp_list.clear()
+        for thread in threads:
+            self._warp_list.append(thread)
+
+    @property
+    def weft(self):
+        """
+        ThreadList: The WeftThreads of this draft.
+        """
+        return self._weft_list
+
+    @weft.setter
+    def weft(self, threads):
+        threads = [WeftThread(thread.color, thread.shafts, thread.treadles, thread.spacing) for thread in threads]
+        self._weft_list.clear()
+        for thread in threads:
+            self._weft_list.append(thread)
+
+    @property
+    def computed_floats(self):
+        """
+        Floats: Every float in the drawdown, from compute_float_arrays().
+        """
+        return self.update_floats()
+
+    @property
+    def thread_counts(self):
+        """
+        dict: Counts of each thread color and spacing, from count_threads().
+        """
+        if 'thread_counts' not in self._derived:
+            self.count_threads()
+        return self._derived['thread_counts']
+
+    @property
+    def thread_stats(self):
+        """
+        dict: Unique yarn spacing,color stats from gather_metrics().
+        """
+        floats = self.computed_floats
+        if self._derived.get('thread_stats_floats') is not floats:
+            self.gather_metrics()
+            self._derived['thread_stats_floats'] = floats
+        return self._derived['thread_stats']
+
+    @property
+    def float_summary(self):
+        """
+        FloatSummary: Longest floats, float histograms, balance and selvedge floats.
+        """
+        floats = self.computed_floats
+        summary = self._derived.get('float_summary')
+        if summary is None or summary.floats is not floats:
+            summary = self._derived['float_summary'] = FloatSummary(floats, len(self.warp))
+        return summary
+
+    @property
+    def css_colors(self):
+        """
+        list: of [css label, Color] pairs for the SVG renderer, from assign_all_css_labels().
+        """
+        self.assign_all_css_labels()
+        return self._derived['css_colors']
+
+    @property
+    def collected_notes(self):
+        """
+        list: of notes, source program and creation date for reporting.
+        """
+        if 'collected_notes' not in self._derived:
+            collected = [n for n in self.notes if n and n.lower() != "nil"]
+            if self.source_program:
+                collected.append("(source program: %s.  Version: %s)" % (self.source_program, self.source_version))
+            if self.creation_date:
+                collected.append("(created on %s)" % (self.creation_date))
+            self._derived['collected_notes'] = collected
+        return self._derived['collected_notes']
+
+    def _derived_data(self):
+        " the derived data, emptied if rising_shed has changed since it was computed "
+        if self._derived.get('rising_shed', self.rising_shed) != self.rising_shed:
+            self._derived.clear()
+        self._derived['rising_shed'] = self.rising_shed
+        return self._derived
+
+    def _touch(self):
+        " record a change to thread colors or spacing, which only affects the summary data "
+        self.mutation_count += 1
+        for name in ('thread_counts', 'thread_stats_floats', 'css_colors'):
+            self._derived.pop(name, None)
+
+    def mark_dirty(self, axis=None, start=0, stop=None):
+        """
+        Record a change to the threading, treadling or liftplan so the cached drawdown and
+        floats are brought up to date, for just the changed threads, when next used.
+         - Draft methods and thread attributes call this themselves.
+         - Changes to the tieup are found by comparing it with the cached one.
+
+        Args:
+            axis (str, optional): 'warp' or 'weft'. None if everything has changed,
+            start (int, optional): index of the first changed thread,
+            stop (int, optional): index after the last changed thread. Defaults to the end.
+        """
+        self._touch()
+        for dirty in self._dirty.values():
+            if axis is None:
+                dirty['all'] = True
+            else:
+                if stop is None:
+                    stop = len(getattr(self, axis))
+                current = dirty[axis]
+                dirty[axis] = (start, stop) if current is None else (min(current[0], start), max(current[1], stop))
+
+    def invalidate_derived(self):
+        """
+        Discard computed_floats, thread_counts, thread_stats, css labels and collected_notes
+        so they are computed again when next used.
+         - Needed after changing notes or other metadata directly.
+        """
+        self._derived.clear()
+
+    def _lookup(self):
+        " map each Shaft and Treadle to its zero based position in self.shafts or self.treadles "
+        cache = self._lookup_cache
+        if cache.get('_sizes') != (len(self.shafts), len(self.treadles)) or \
+                any(cache.get(item) != i for i, item in enumerate(self.shafts)) or \
+                any(cache.get(item) != i for i, item in enumerate(self.treadles)):
+            # a new dict, so masks cached against the old positions are rebuilt
+            cache = self._lookup_cache = {}
+            cache.update({shaft: i for i, shaft in enumerate(self.shafts)})
+            cache.update({treadle: i for i, treadle in enumerate(self.treadles)})
+            cache['_sizes'] = (len(self.shafts), len(self.treadles))
+        return cache
+
+    def _shaft_index(self, shaft):
+        " zero based index of shaft (Shaft, int or None) for the warp shaft column "
+        if shaft is None:
+            return -1
+        if isinstance(shaft, (int, np.integer)):
+            return int(shaft)
+        index = self._lookup_cache.get(shaft)
+        if index is None or index >= len(self.shafts) or self.shafts[index] is not shaft:
+            index = self._lookup()[shaft]
+        return index
+
+    def _color_index(self, color):
+        " palette index for color, adding it to the palette if new "
+        if not color:
+            return NO_COLOR
+        if isinstance(color, Color):
+            key = (color.rgb, color.shadeable)
+        elif isinstance(color, (tuple, list)):
+            key = (tuple(color), True)
+        else:
+            color = color_cache.get(color, True)
+            key = (color.rgb, color.shadeable)
+        index = self._palette_lookup.get(key)
+        if index is None:
+            if 'palette' in self._shared:
+                self.palette = list(self.palette)
+                self._palette_lookup = dict(self._palette_lookup)
+                self._shared.discard('palette')
+            # share one Color between all drafts using it
+            color = color_cache.get(color, key[1])
+            index = len(self.palette)
+            if index >= NO_COLOR:
+                raise DraftError("too many colors in draft")
+            self.palette.append(color)
+            self._palette_lookup[key] = index
+        return index
+
+    def _column(self, axis, name):
+        " the named column ready to change. Creates optional (renderer) columns on first use, copies shared ones "
+        columns = getattr(self, '_' + axis)
+        if name not in columns:
+            size = len(columns['color'])
+            if name == 'css_hash':
+                columns[name] = array('i', [-1]) * size
+            else:  # yarn_width keeps the renderer's ints or floats as given
+                columns[name] = [None] * size
+        elif (axis, name) in self._shared:
+            columns[name] = columns[name][:]
+            self._shared.discard((axis, name))
+        return columns[name]
+
+    @property
+    def repeats(self):
+        """
+        tuple: Number of virtual repeats of the (warp, weft), from repeat(n, virtual=True).
+        """
+        return self._repeats['warp'], self._repeats['weft']
+
+    def materialize(self):
+        """
+        Expand virtual repeats into real threads, so each thread can be changed on its own.
+         - Done automatically before changing any one thread or adding threads.
+        """
+        self._materialize('warp')
+        self._materialize('weft')
+
+    def _materialize(self, axis):
+        " expand the virtual repeats of the warp or weft columns "
+        repeats = self._repeats[axis]
+        if repeats > 1:
+            columns = getattr(self, '_' + axis)
+            for name, column in columns.items():
+                columns[name] = column * repeats
+                self._shared.discard((axis, name))
+            self._repeats[axis] = 1
+
+    def _set_mask(self, name, index, mask):
+        " store a weft shafts/treadles bit mask, widening the column if it no longer fits "
+        column = self._column('weft', name)
+        try:
+            column[index] = mask
+        except OverflowError:
+            column = self._weft[name] = list(column)
+            column[index] = mask
+        self.mark_dirty('weft', index, index + 1)
+
+    def _append_thread(self, axis, color, spacing, shaft=None, shafts=(), treadles=()):
+        " add a row to the warp or weft columns "
+        self._materialize(axis)
+        columns = getattr(self, '_' + axis)
+        for name in list(columns):
+            column = self._column(axis, name)
+            if name == 'color':
+                column.append(self._color_index(color))
+            elif name == 'spacing':
+                column.append(float('nan') if spacing is None else spacing)
+            elif name == 'shaft':
+                column.append(self._shaft_index(shaft))
+            elif name in ('shafts', 'treadles'):
+                column.append(0)
+            elif name == 'css_hash':
+                column.append(-1)
+            else:
+                column.append(None)
+        index = len(columns['color']) - 1
+        if axis == 'weft':
+            lookup = self._lookup()
+            self._set_mask('shafts', index, _to_mask(shafts or (), lookup))
+            self._set_mask('treadles', index, _to_mask(treadles or (), lookup))
+        self._position_index = None
+        self.mark_dirty(axis, index, index + 1)
+        return index
+
     @classmethod
     def from_json(cls, s):
         """
         Construct a new Draft instance from its JSON representation.
-        Counterpart to ``.to_json()``.
+        Counterpart to ``.to_json()``. Reads both the columnar (version 2)
+        and the original (one object per thread) formats.
         """
         obj = json.loads(s)
+        if obj.get('version', 1) >= 2:
+            return cls._from_columns(obj)
         warp = obj.pop('warp')
         weft = obj.pop('weft')
         tieup = obj.pop('tieup')
@@ -251,35 +1290,90 @@ class Draft(object):
 
         return draft
 
-    def to_json(self):
+    @classmethod
+    def _from_columns(cls, obj):
+        " Draft from a version 2 json object "
+        header = dict(obj)
+        arrays = []
+        for axis in ('warp', 'weft'):
+            columns = {name: _decode_column(column) for name, column in header.pop(axis).items()}
+            columns['color'] = [NO_COLOR if color == -1 else color for color in columns['color']]
+            columns['spacing'] = [float('nan') if spacing is None else spacing for spacing in columns['spacing']]
+            arrays.append(columns)
+        return cls.from_arrays(header, *arrays)
+
+    @classmethod
+    def from_arrays(cls, header, warp, weft):
         """
-        Serialize a Draft to its JSON representation. Counterpart to
-        ``.from_json()``.
+        Construct a new Draft from a header and the columns of its threads.
+        Counterpart to ``.header()`` and ``.thread_arrays()``, used by the binary formats.
+
+        Args:
+            header (dict): from header(),
+            warp (dict): of sequences or numpy arrays, from thread_arrays('warp'),
+            weft (dict): of sequences or numpy arrays, from thread_arrays('weft').
+        """
+        header = dict(header)
+        if header.pop('version', 2) > 2:
+            raise DraftError("draft format is newer than this version of pyweaving")
+        palette = header.pop('palette')
+        tieup = header.pop('tieup')
+        warp_repeats, weft_repeats = header.pop('repeats', (1, 1))
+        draft = cls(**header)
+        num_shafts, num_treadles = len(draft.shafts), len(draft.treadles)
+
+        # palette index in the file to index in the draft
+        colors = np.full(NO_COLOR + 1, NO_COLOR, dtype=np.uint16)
+        colors[:len(palette)] = [draft._color_index(tuple(rgb)) for rgb in palette]
+        for axis, columns in (('warp', warp), ('weft', weft)):
+            if len(set(len(column) for column in columns.values())) > 1:
+                raise DraftError("%s columns differ in length" % axis)
+            color = np.asarray(columns['color'], dtype=np.intp)
+            if len(color) and (color.min() < 0 or color.max() > NO_COLOR or
+                               color[color != NO_COLOR].max(initial=-1) >= len(palette)):
+                raise DraftError("%s color not in palette" % axis)
+            target = getattr(draft, '_' + axis)
+            target['color'].frombytes(colors[color].tobytes())
+            target['spacing'].frombytes(np.asarray(columns['spacing'], dtype=np.float32).tobytes())
+        shaft = np.asarray(warp['shaft'], dtype=np.int16)
+        if len(shaft) and not -1 <= shaft.min() <= shaft.max() < num_shafts:
+            raise DraftError("warp shaft out of range")
+        draft._warp['shaft'].frombytes(shaft.tobytes())
+        for name, bits in (('shafts', num_shafts), ('treadles', num_treadles)):
+            masks = weft[name]
+            if isinstance(masks, np.ndarray) and masks.ndim == 2:  # bits of each mask
+                masks = [_to_mask(np.flatnonzero(row), None) for row in masks]
+            column = draft._weft[name] = _mask_column(bits)
+            if isinstance(column, array):
+                column.frombytes(np.asarray(masks, dtype=np.uint64).tobytes())
+            else:
+                column.extend(int(mask) for mask in masks)
+            if len(column) and max(column) >> bits:
+                raise DraftError("weft %s out of range" % name)
+        for treadle, shaft_nos in zip(draft.treadles, tieup):
+            treadle.shafts = set(draft.shafts[n] for n in shaft_nos)
+        draft.add_virtual_repeats(warp=warp_repeats - 1, weft=weft_repeats - 1)
+        return draft
+
+    def header(self):
         """
-        return json.dumps({
+        Everything about the draft but its threads, as saved by to_json() (version 2).
+
+        Returns:
+            dict: suitable for json.
+        """
+        lookup = self._lookup()
+        return {
+            'version': 2,
             'liftplan': self.liftplan,
             'rising_shed': self.rising_shed,
             'num_shafts': len(self.shafts),
             'num_treadles': len(self.treadles),
             'warp_units': self.warp_units,
             'weft_units': self.weft_units,
-            'warp': [{
-                'color': thread.color.rgb,
-                'shaft': self.shafts.index(thread.shaft),
-                'spacing': thread.spacing,
-            } for thread in self.warp],
-            'weft': [{
-                'color': thread.color.rgb,
-                'treadles': [self.treadles.index(tr)
-                             for tr in thread.treadles],
-                'shafts': [self.shafts.index(sh)
-                           for sh in thread.connected_shafts],
-                'spacing': thread.spacing,
-            } for thread in self.weft],
-            'tieup': [
-                [self.shafts.index(sh) for sh in treadle.shafts]
-                for treadle in self.treadles
-            ],
+            'palette': [color.rgb for color in self.palette],
+            'tieup': [sorted(lookup[sh] for sh in treadle.shafts) for treadle in self.treadles],
+            'repeats': list(self.repeats),
             'date': self.date,
             'title': self.title,
             'author': self.author,
@@ -288,13 +1382,179 @@ class Draft(object):
             'telephone': self.telephone,
             'fax': self.fax,
             'notes': self.notes,
-        }, ensure_ascii=False)
+        }
+
+    def thread_arrays(self, axis):
+        """
+        Copies of the columns holding one repeat of the warp or weft:
+         - color: palette index (uint16, NO_COLOR for none),
+         - spacing: float32, nan for none,
+         - shaft (warp): zero based shaft (int16, -1 for none),
+         - shafts, treadles (weft): bit masks (uint64), or bool arrays (picks x shafts or treadles)
+           if there are more than 64.
+
+        Args:
+            axis (str): 'warp' or 'weft'.
+        Returns:
+            dict: of numpy.ndarray
+        """
+        columns = getattr(self, '_' + axis)
+        arrays = {'color': np.array(_column_array(columns['color'], np.uint16)),
+                  'spacing': np.array(_column_array(columns['spacing'], np.float32))}
+        if axis == 'warp':
+            arrays['shaft'] = np.array(_column_array(columns['shaft'], np.int16))
+        else:
+            for name, items in (('shafts', self.shafts), ('treadles', self.treadles)):
+                column = columns[name]
+                if isinstance(column, array):
+                    arrays[name] = np.array(_column_array(column, np.uint64))
+                else:
+                    arrays[name] = _mask_matrix(column, len(items))
+        return arrays
+
+    def to_json(self, version=2, run_length=False):
+        """
+        Serialize a Draft to its JSON representation. Counterpart to
+        ``.from_json()``.
+
+        Version 2 holds each thread attribute as one flat list, over one repeat:
+         - palette: rgb of each color, warp and weft color are indexes into it (-1 for none),
+         - warp shaft: zero based (-1 for none),
+         - weft shafts, treadles: bit masks, bit 0 for the first shaft or treadle,
+         - repeats: virtual repeats of the warp and weft.
+
+        Args:
+            version (int, optional): 1 for the original format of one object per thread,
+            run_length (bool, optional): store the version 2 lists as
+                {"values": [...], "counts": [...]} runs.
+        """
+        header = self.header()
+        if version < 2:
+            lookup = self._lookup()
+            meta = dict((name, header[name]) for name in
+                        ('date', 'title', 'author', 'address', 'email', 'telephone', 'fax', 'notes'))
+            return json.dumps(dict({
+                'liftplan': self.liftplan,
+                'rising_shed': self.rising_shed,
+                'num_shafts': len(self.shafts),
+                'num_treadles': len(self.treadles),
+                'warp_units': self.warp_units,
+                'weft_units': self.weft_units,
+                'warp': [{
+                    'color': thread.color.rgb,
+                    'shaft': lookup[thread.shaft],
+                    'spacing': thread.spacing,
+                } for thread in self.warp],
+                'weft': [{
+                    'color': thread.color.rgb,
+                    'treadles': [lookup[tr] for tr in thread.treadles],
+                    'shafts': [lookup[sh] for sh in thread.connected_shafts],
+                    'spacing': thread.spacing,
+                } for thread in self.weft],
+                'tieup': header['tieup'],
+            }, **meta), ensure_ascii=False)
+
+        encode = _run_length_encode if run_length else list
+
+        def colors(columns):
+            return encode([-1 if color == NO_COLOR else color for color in columns['color']])
+
+        def spacings(columns):
+            return encode([_from_float32(spacing) for spacing in columns['spacing']])
+
+        header['warp'] = {
+            'color': colors(self._warp),
+            'shaft': encode(self._warp['shaft']),
+            'spacing': spacings(self._warp),
+        }
+        header['weft'] = {
+            'color': colors(self._weft),
+            'shafts': encode(self._weft['shafts']),
+            'treadles': encode(self._weft['treadles']),
+            'spacing': spacings(self._weft),
+        }
+        return json.dumps(header, ensure_ascii=False)
 
     def copy(self):
         """
         Return a complete copy of this draft.
+         - The thread columns and palette are shared by both drafts until one of them changes them.
+         - Colors in the palette are shared, as they are between drafts using the same colors.
+        """
+        draft = object.__new__(type(self))
+        draft.__dict__.update(self.__dict__)
+        draft.notes = list(self.notes)
+        draft.draft_title = list(self.draft_title)
+        draft.shafts = [Shaft(shaft.index) for shaft in self.shafts]
+        new_shafts = dict(zip(self.shafts, draft.shafts))
+        draft.treadles = [Treadle(treadle.index, [new_shafts.get(shaft, shaft) for shaft in treadle.shafts], draft)
+                          for treadle in self.treadles]
+        draft._lookup_cache = {}
+        # share the columns
+        draft._warp = dict(self._warp)
+        draft._weft = dict(self._weft)
+        draft._repeats = dict(self._repeats)
+        shared = set([('warp', name) for name in self._warp] + [('weft', name) for name in self._weft])
+        shared.add('palette')
+        self._shared |= shared
+        draft._shared = shared
+        draft._warp_list = ThreadList(draft, WarpThread)
+        draft._weft_list = ThreadList(draft, WeftThread)
+        # share the drawdown too, floats and stats refer to their own draft so are computed again
+        draft._derived = {}
+        draft._dirty = {}
+        if self._drawdown_matrix is not None and 'matrix' in self._dirty:
+            draft._drawdown_matrix = dict(self._drawdown_matrix)
+            draft._dirty['matrix'] = dict(self._dirty['matrix'])
+            self._shared.add('drawdown')
+            draft._shared.add('drawdown')
+        else:
+            draft._drawdown_matrix = None
+        return draft
+
+    def fingerprint(self, colors=True):
         """
-        return deepcopy(self)
+        Content hash of the draft for finding duplicates and keying caches.
+         - Covers the threading, tieup, treadling, liftplan and shed, and optionally
+           the thread colors (as rgb) and spacing.
+         - Independent of metadata, palette order and object identity, and the same
+           for virtual repeats as for the expanded threads.
+
+        Args:
+            colors (bool, optional): False to compare structure only.
+        Returns:
+            str: hex digest.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(json.dumps([1, self.liftplan, self.rising_shed, len(self.shafts), len(self.treadles),
+                                  len(self.warp), len(self.weft), self.tieup_masks(), colors]).encode())
+
+        def update(axis, data):
+            for ii in range(self._repeats[axis]):
+                digest.update(data)
+
+        def masks(column, bits):
+            if isinstance(column, array):
+                return _column_array(column, np.uint64).astype('<u8').tobytes()
+            size = (bits + 7) // 8
+            return b''.join(mask.to_bytes(size, 'little') for mask in column)
+
+        update('warp', _column_array(self._warp['shaft'], np.int16).astype('<i2').tobytes())
+        update('weft', masks(self._weft['shafts'], len(self.shafts)))
+        update('weft', masks(self._weft['treadles'], len(self.treadles)))
+        if colors:
+            # rgb and a flag per palette entry, then one for no color
+            table = np.zeros((len(self.palette) + 1, 4), dtype=np.uint8)
+            for row, color in enumerate(self.palette):
+                table[row] = tuple(color.rgb) + (1,)
+            for axis in ('warp', 'weft'):
+                columns = getattr(self, '_' + axis)
+                index = _column_array(columns['color'], np.uint16).astype(np.intp)
+                index[index == NO_COLOR] = len(self.palette)
+                update(axis, table[index].tobytes())
+                spacing = _column_array(columns['spacing'], np.float32).astype('<f4')
+                update(axis, np.where(np.isnan(spacing), np.float32('nan'), spacing).tobytes())
+        return digest.hexdigest()
 
     def add_warp_thread(self, color=None, index=None, shaft=None, spacing=None):
         """
@@ -307,18 +1567,12 @@ class Draft(object):
             shaft (Shaft, optional): Shaft this thread is on,
             spacing (float, optional): size of spacing of this thread.
         """
-        if isinstance(shaft, int):
-            shaft = self.shafts[shaft]
-
         if index is None:
-            thread = WarpThread(color=color,
-                                shaft=shaft,
-                                spacing=spacing)
-            self.warp.append(thread)
+            self._append_thread('warp', color, spacing, shaft=shaft)
         else:  # threads not in numerical order
             if index > len(self.warp):
                 for i in range(index - len(self.warp)):  # +1
-                    self.warp.append(WarpThread())
+                    self._append_thread('warp', None, None)
             thread = self.warp[index]
             thread.color = color
             thread.shaft = shaft
@@ -337,34 +1591,16 @@ class Draft(object):
             treadles (list of Treadle): Treadles this weft thread is driven by.
             spacing (float): size of spacing of this thread.
         """
-        shafts = shafts or set()
-        shaft_objs = set()
-        for shaft in shafts:
-            if isinstance(shaft, int):
-                shaft = self.shafts[shaft]
-            shaft_objs.add(shaft)
-        treadles = treadles or set()
-        treadle_objs = set()
-        for treadle in treadles:
-            if not isinstance(treadle, Treadle):
-                treadle = self.treadles[treadle]
-            treadle_objs.add(treadle)
-        thread = WeftThread(
-            color=color,
-            shafts=shaft_objs,
-            treadles=treadle_objs,
-            spacing=spacing,
-        )
         if index is None:
-            self.weft.append(thread)
+            self._append_thread('weft', color, spacing, shafts=shafts, treadles=treadles)
         else:
             if index > len(self.weft):
                 for i in range(index - len(self.weft)):  # +1
-                    self.weft.append(WeftThread())
+                    self._append_thread('weft', None, None)
             thread = self.weft[index]
             thread.color = color
-            thread.shaft = shaft_objs
-            thread.treadles = treadle_objs,
+            thread.shafts = shafts
+            thread.treadles = treadles
             thread.spacing = spacing
 
     def assign_css_labels(self, threads, stats, suffix):
@@ -373,7 +1609,7 @@ class Draft(object):
         I.e. Find all the unique color/spacing combinations and collate to a minimal set.
         Used by SVG renderer only (for efficiency).
 
-            - Called from process_draft()
+            - Called from assign_all_css_labels()
             - Collect colors in self.css_colors
 
         Args:
@@ -383,111 +1619,255 @@ class Draft(object):
         """
         # prep css labels
         labels = []
+        lookup = {}  # (rgb, spacing) to label index
         for i, (c, s, _) in enumerate(stats):
             labels.append([c, s, i, "%scol%d" % (suffix, i)])
+            lookup.setdefault((c.rgb if c else None, s), i)
         # remember for svg hashing if required
         self.hash_colorkeys = labels
-        # assign labels to threads
-        for thread in threads:
-            color = thread.color
-            spacing = thread.spacing
-            # find the right color/spacing match
-            for c, s, i, name in labels:
-                if c == color and s == spacing:
-                    thread.css_label = name
-                    # remember for svg hashing if required
-                    thread.css_hash = i
-                    break
+        # assign labels to threads (css_label is derived from css_hash)
+        columns = threads._columns()
+        hashes = self._column(suffix, 'css_hash')
+        found = {}  # (palette index, spacing) to label index
+        for index, (color, spacing) in enumerate(zip(columns['color'], columns['spacing'])):
+            key = (color, spacing if spacing == spacing else None)  # nan != nan
+            label = found.get(key, -1)
+            if label == -1:
+                rgb = None if color == NO_COLOR else self.palette[color].rgb
+                label = found[key] = lookup.get((rgb, _from_float32(spacing)))
+            if label is not None:
+                hashes[index] = label
         # remember name:color relationship for svg renderer
-        self.css_colors.extend([[name, color] for color, _, _, name in labels])
+        self._derived['css_colors'].extend([[name, color] for color, _, _, name in labels])
+
+    def assign_all_css_labels(self):
+        """
+        Assign css labels to the warp and weft, unless already done.
+         - Called by the SVG renderer. Other outputs do not need them.
+        """
+        if 'css_colors' not in self._derived:
+            self._derived['css_colors'] = []
+            # uniquely name each unique thread (warp,weft independent)
+            self.assign_css_labels(self.warp, self.thread_counts["warp"], "warp")
+            self.assign_css_labels(self.weft, self.thread_counts["weft"], "weft")
 
     def _count_colour_spacings(self, threads):
-        " threads are self.weft or self.warp - usedby gather_metrics"
-        # extract weft color, spacing numbers
-        stats = []  # pairs of (thread color, spacing)
-        counter = []
-        for thread in threads:
-            t_data = (thread.color, thread.spacing)
-            if t_data not in stats:
-                stats.append(t_data)
-                counter.append(1)
-            else:
-                index = stats.index(t_data)
-                counter[index] += 1
-        return [(c, s, i) for (c, s), i in zip(stats, counter)]
+        " threads are self.weft or self.warp - usedby count_threads"
+        # count each (palette index, spacing) in the columns, in order of first use
+        columns = threads._columns()
+        colors = _column_array(columns['color'], np.uint16)
+        spacings = _column_array(columns['spacing'], np.float32)
+        # palette entries with the same rgb count as one color
+        canonical = colors.copy()
+        first_use = {}
+        for i, color in enumerate(self.palette):
+            first = first_use.setdefault(color.rgb, i)
+            if first != i:
+                canonical[colors == i] = first
+        keys = (canonical.astype(np.uint64) << np.uint64(32)) | spacings.view(np.uint32)
+        _, first_index, counts = np.unique(keys, return_index=True, return_counts=True)
+        counts *= self._repeats[threads._cls._axis]
+        order = np.argsort(first_index)
+        stats = []
+        for index, count in zip(first_index[order].tolist(), counts[order].tolist()):
+            color = colors[index]
+            stats.append((None if color == NO_COLOR else self.palette[color],
+                          _from_float32(spacings[index]), count))
+        return stats
 
     def _count_spacings(self, thread_stats):
-        " simplify thread_stats (c,s,i) to pairs of (spacing,count) - usedby gather_metrics"
-        spacings = []
-        counter = []
+        " simplify thread counts (c,s,i) to pairs of (spacing,count) - usedby count_threads"
+        counter = {}
         for c, s, i in thread_stats:
-            if s not in spacings:
-                spacings.append(s)
-                counter.append(i)
-            else:
-                index = spacings.index(s)
-                counter[index] += i
-        return list(zip(spacings, counter))
+            counter[s] = counter.get(s, 0) + i
+        return list(counter.items())
 
-    def gather_metrics(self):
+    def count_threads(self):
         """
         Loop through warp and weft threads, gathering unique spacings and colors
-        so we can show spacings in drawdowns and use in informational stats.
+        so we can show spacings in drawdowns, label them for css and use them in stats.
+         - Needs only the thread colors and spacings, not the drawdown.
 
-         - also warp/weft balance
-         - also list of unique threads from combined warp, weft
-         - also warp floats on edges - E.g. will we need floating selvedges
-
-        Keep everything in thread_stats by label:
+        Keep everything in thread_counts by label:
          - 'weft' = color, spacing for each thread
          - 'warp' = same
          - 'weft_spacings' = sorted list of summary of weft'
          - 'warp_spacings' = same
          - 'summary' = summary of all spacings used (warp and weft)
-         - 'warp_ratio' = warp count/ weft count
          - 'unique_threads' = list of all unique threads (col, spacing) in both warp and weft.
-         - 'selvedge_floats' = longest float on a warp edge
         """
+        counts = self._derived['thread_counts'] = {}
         # Extract weft color, spacing numbers
-        self.thread_stats["weft"] = self._count_colour_spacings(self.weft)
+        counts["weft"] = self._count_colour_spacings(self.weft)
         # simplify to pairs of (spacing,count)
-        self.thread_stats["weft_spacings"] = sorted(self._count_spacings(self.thread_stats["weft"]))
+        counts["weft_spacings"] = sorted(self._count_spacings(counts["weft"]))
         # warp
-        self.thread_stats["warp"] = self._count_colour_spacings(self.warp)
+        counts["warp"] = self._count_colour_spacings(self.warp)
         # simplify
-        self.thread_stats["warp_spacings"] = sorted(self._count_spacings(self.thread_stats["warp"]))
+        counts["warp_spacings"] = sorted(self._count_spacings(counts["warp"]))
         # Summary
-        all_spacings = [s for (s, i) in self.thread_stats["weft_spacings"] if s]
-        for (s, i) in self.thread_stats["warp_spacings"]:
-            if s and s not in all_spacings:
-                all_spacings.append(s)
-        self.thread_stats["summary"] = sorted(all_spacings)
-
-        floats = self.computed_floats
-        # Warp/WeftBalance
-        warp_count = sum([length + 1 for start, end, visible, length, thread in floats
-                         if visible and isinstance(thread, WarpThread)])
-        weft_count = sum([length + 1 for start, end, visible, length, thread in floats
-                         if visible and isinstance(thread, WeftThread)])
-        self.thread_stats["warp_ratio"] = warp_count / max(weft_count, 1)  # !! twill error if badly formed floaty wif
+        all_spacings = dict.fromkeys(s for (s, i) in counts["weft_spacings"] + counts["warp_spacings"] if s)
+        counts["summary"] = sorted(all_spacings)
 
         # Unique threads
-        unique_threads = [[t[0], t[1]] for t in self.thread_stats["warp"]]
-        for col2, sp2, _ in self.thread_stats["weft"]:
-            found = False
-            for color, spacing in unique_threads:
-                if col2 == color and sp2 == spacing:
-                    found = True
-                    break
-            if not found:
+        unique_threads = [[t[0], t[1]] for t in counts["warp"]]
+        found = set((color.rgb if color else None, spacing) for color, spacing in unique_threads)
+        for col2, sp2, _ in counts["weft"]:
+            key = (col2.rgb if col2 else None, sp2)
+            if key not in found:
+                found.add(key)
                 unique_threads.append((col2, sp2))
-        self.thread_stats["unique_threads"] = unique_threads
+        counts["unique_threads"] = unique_threads
+
+    def gather_metrics(self):
+        """
+        Gather the thread counts from count_threads() and the float based stats
+        for informational stats.
 
+         - also warp/weft balance
+         - also warp floats on edges - E.g. will we need floating selvedges
+
+        Keep everything in thread_stats by label, the thread_counts and:
+         - 'warp_ratio' = warp count/ weft count
+         - 'selvedge_floats' = longest float on a warp edge
+        """
+        stats = self._derived['thread_stats'] = dict(self.thread_counts)
+        summary = self.float_summary
+        # Warp/WeftBalance
+        stats["warp_ratio"] = summary.warp_ratio
         # Floating Selvedges required ?
-        start, end = 0, len(self.warp) - 1
-        longest = [length for s, e, visible, length, thread in floats
-                   if (s[0] == start or s[0] == end) and isinstance(thread, WarpThread)]
-        self.thread_stats["selvedge_floats"] = longest
+        stats["selvedge_floats"] = summary.selvedge_floats
+
+    def tieup_masks(self):
+        """
+        The tieup as one shaft bit mask per treadle, bit 0 for the first Shaft.
+
+        Returns:
+            list: of int, one per Treadle.
+        """
+        lookup = self._lookup()
+        return [treadle._position_mask(lookup) for treadle in self.treadles]
+
+    def lift_masks(self):
+        """
+        Shaft bit mask of the shafts connected on each pick. The bitwise form of compute_lift_matrix().
+
+        Returns:
+            list: of int, one per pick, bit 0 for the first Shaft.
+        """
+        tieup = self.tieup_masks()
+        return [_lift_mask(shafts, treadles, tieup)
+                for shafts, treadles in zip(self._weft['shafts'], self._weft['treadles'])] * self._repeats['weft']
+
+    def _tieup_matrix(self, masks=None):
+        " tieup as a boolean array (treadles x shafts) "
+        masks = self.tieup_masks() if masks is None else masks
+        column = _mask_column(len(self.shafts))
+        column.extend(masks)
+        return _mask_matrix(column, len(self.shafts))
+
+    def _lift_rows(self, start, stop, tieup):
+        " rows start:stop of the lift matrix "
+        unit = len(self._weft['color'])
+        if stop > unit:  # virtual repeats
+            return self._lift_rows(0, unit, tieup)[np.arange(start, stop) % unit]
+        lifts = _mask_matrix(self._weft['shafts'][start:stop], len(self.shafts))
+        treadling = _mask_matrix(self._weft['treadles'][start:stop], len(self.treadles))
+        # treadles only used on picks without a liftplan
+        treadling[lifts.any(axis=1)] = False
+        if len(self.treadles):
+            lifts |= (treadling.astype(np.uint8) @ tieup.astype(np.uint8)) > 0
+        return lifts
+
+    def _shed(self, lifts, threading):
+        " drawdown of the given warp threading over the given picks' lifts "
+        # extra (never lifted) row at the end for unthreaded warps
+        shaft_lifts = np.vstack([lifts.T, np.zeros((1, len(lifts)), dtype=bool)])
+        lifted = shaft_lifts[threading]
+        return lifted if self.rising_shed else ~lifted
+
+    def compute_lift_matrix(self):
+        """
+        Compute a boolean array (picks x shafts) of the shafts connected on each pick.
+         - Picks with Shafts (liftplan) use them directly.
+         - Otherwise the treadling is multiplied through the tieup.
+
+        Returns:
+            numpy.ndarray: of bool, shape (len(weft), len(shafts))
+        """
+        return self._lift_rows(0, len(self.weft), self._tieup_matrix())
+
+    def compute_drawdown_matrix(self):
+        """
+        Compute the whole drawdown as a boolean array (warp x weft).
+        True where the warp thread is on top (visible) and False where the weft is.
+
+         - The threading is used as a one-hot lookup (gather) into the lift matrix.
+         - Result is cached. Only the threads marked by mark_dirty() are recomputed,
+           unless the tieup or rising_shed has changed.
+
+        Returns:
+            numpy.ndarray: of bool, shape (len(warp), len(weft))
+        """
+        cache = self._drawdown_matrix
+        dirty = self._dirty.get('matrix')
+        num_warp, num_weft = len(self.warp), len(self.weft)
+        masks = (len(self.shafts), self.tieup_masks())
+        if cache is None or dirty is None or dirty['all'] or \
+                cache['rising_shed'] != self.rising_shed or cache['tieup_masks'] != masks or \
+                cache['matrix'].shape[0] > num_warp or cache['matrix'].shape[1] > num_weft:
+            tieup = self._tieup_matrix(masks[1])
+            lifts = self._lift_rows(0, num_weft, tieup)
+            cache = self._drawdown_matrix = {'rising_shed': self.rising_shed, 'tieup': tieup, 'tieup_masks': masks,
+                                             'lifts': lifts, 'matrix': self._shed(lifts, self._threading())}
+            self._shared.discard('drawdown')
+            # anything built from the old matrix must be rebuilt
+            for other in self._dirty.values():
+                other['all'] = True
+        elif dirty['warp'] or dirty['weft'] or cache['matrix'].shape != (num_warp, num_weft):
+            self._update_matrix(cache, dirty['warp'], dirty['weft'])
+        self._dirty['matrix'] = _clean()
+        return cache['matrix']
+
+    def _threading(self):
+        " zero based shaft index of each warp thread, -1 if unthreaded "
+        return np.tile(np.array(self._warp['shaft'], dtype=np.intp), self._repeats['warp'])
+
+    def _update_matrix(self, cache, warp_range, weft_range):
+        " recompute the changed (and added) threads of the cached drawdown matrix "
+        lifts, matrix = cache['lifts'], cache['matrix']
+        if 'drawdown' in self._shared:
+            lifts, matrix = lifts.copy(), matrix.copy()
+            self._shared.discard('drawdown')
+        old_warp, old_weft = matrix.shape
+        num_warp, num_weft = len(self.warp), len(self.weft)
+        if num_weft > old_weft:
+            lifts = np.vstack([lifts, np.zeros((num_weft - old_weft, lifts.shape[1]), dtype=bool)])
+            matrix = np.hstack([matrix, np.zeros((old_warp, num_weft - old_weft), dtype=bool)])
+            weft_range = _union(weft_range, (old_weft, num_weft))
+        if num_warp > old_warp:
+            matrix = np.vstack([matrix, np.zeros((num_warp - old_warp, num_weft), dtype=bool)])
+            warp_range = _union(warp_range, (old_warp, num_warp))
+        threading = self._threading()
+        if weft_range:
+            start, stop = weft_range
+            lifts[start:stop] = self._lift_rows(start, stop, cache['tieup'])
+            matrix[:, start:stop] = self._shed(lifts[start:stop], threading)
+        if warp_range:
+            start, stop = warp_range
+            matrix[start:stop] = self._shed(lifts, threading[start:stop])
+        cache['lifts'], cache['matrix'] = lifts, matrix
+
+    def invalidate_drawdown(self):
+        """
+        Discard the cached drawdown matrix, position index and derived data.
+        Needed after changing threads, shafts or treadles directly (not via Draft methods).
+        """
+        self.mutation_count += 1
+        self._drawdown_matrix = None
+        self._position_index = None
+        self._derived.clear()
+        self._dirty.clear()
 
     def compute_drawdown_at(self, position):
         """
@@ -498,102 +1878,102 @@ class Draft(object):
             position (tuple X,Y): position as (x,y) pair
         """
         x, y = position
-        warp_thread = self.warp[x]
-        weft_thread = self.weft[y]
-
-        connected_shafts = weft_thread.connected_shafts
-        warp_at_rest = warp_thread.shaft not in connected_shafts
-        if warp_at_rest ^ self.rising_shed:
-            return warp_thread
+        if self.compute_drawdown_matrix()[x, y]:
+            return self.warp[x]
         else:
-            return weft_thread
+            return self.weft[y]
 
     def compute_drawdown(self):
         """
         Compute a 2D array containing the thread visible at each position.
         """
-        num_warp_threads = len(self.warp)
-        num_weft_threads = len(self.weft)
-        return [[self.compute_drawdown_at((x, y))
-                for y in range(num_weft_threads)]
-                for x in range(num_warp_threads)]
-
-    def process_draft(self):
-        """
-        After reading/creating a draft - do these processes to fill in some reporting datastructures
-         - compute_floats(), gather_metrics(), assign_css_labels(),
-         - collects notes into collected_notes
-        """
-        self.computed_floats = list(self.compute_floats())
-        self.metrics = self.gather_metrics()
-        # uniquely name each unique thread (warp,weft independent)
-        self.assign_css_labels(self.warp, self.thread_stats["warp"], "warp")
-        self.assign_css_labels(self.weft, self.thread_stats["weft"], "weft")
-        # collate notes
-        for n in self.notes:
-            if n and n.lower() != "nil":
-                self.collected_notes.append(n)
-        if self.source_program:
-            self.collected_notes.append("(source program: %s.  Version: %s)" % (self.source_program, self.source_version))
-        if self.creation_date:
-            self.collected_notes.append("(created on %s)" % (self.creation_date))
+        matrix = self.compute_drawdown_matrix()
+        return [[warp_thread if on_top else weft_thread
+                 for on_top, weft_thread in zip(column, self.weft)]
+                for warp_thread, column in zip(self.warp, matrix.tolist())]
 
-    def compute_floats(self):
+    def process_draft(self, css_labels=False):
         """
-        Return an iterator over every float, yielding a tuple for each one::
-        (start, end, visible, length, thread)
+        After reading/creating a draft - discard any derived reporting datastructures.
+        They are computed again when first used:
+         - computed_floats from compute_float_arrays(),
+         - thread_counts from count_threads() and thread_stats from gather_metrics(),
+         - css_colors and thread css labels from assign_all_css_labels(),
+         - collected_notes from notes.
+
+        Args:
+            css_labels (bool, optional): assign the css labels now.
+        """
+        self.invalidate_derived()
+        if css_labels:
+            self.assign_all_css_labels()
+
+    def compute_float_arrays(self):
+        """
+        Run-length encode the drawdown matrix into every float on the warp and weft.
+        Warp floats come first (by warp thread) then the weft floats (by weft thread).
+
+        Returns:
+            Floats: parallel arrays of (axis, thread, start, end, visible, length)
 
         Todo:
             This ignores the back side of the fabric. But we can get the back by inverting the tieup,
             or setting proper args to compute_longest_floats()
         """
-        num_warp_threads = len(self.warp)
-        num_weft_threads = len(self.weft)
-
-        drawdown = self.compute_drawdown()
-
-        # Iterate over each warp thread, then each weft thread
-        # For each thread, find the position of each change in state
-        for x, thread in enumerate(self.warp):
-            this_vis_state = (thread == drawdown[x][0])
-            last = this_start = (x, 0)
-            for y in range(1, num_weft_threads):
-                check_vis_state = (thread == drawdown[x][y])
-                if check_vis_state != this_vis_state:
-                    length = last[1] - this_start[1]
-                    yield this_start, last, this_vis_state, length, thread
-                    this_vis_state = check_vis_state
-                    this_start = x, y
-                last = x, y
-            length = last[1] - this_start[1]
-            yield this_start, last, this_vis_state, length, thread
-
-        for y, thread in enumerate(self.weft):
-            this_vis_state = (thread == drawdown[0][y])
-            last = this_start = (0, y)
-            for x in range(1, num_warp_threads):
-                check_vis_state = (thread == drawdown[x][y])
-                if check_vis_state != this_vis_state:
-                    length = last[0] - this_start[0]
-                    yield this_start, last, this_vis_state, length, thread
-                    this_vis_state = check_vis_state
-                    this_start = x, y
-                last = x, y
-            length = last[0] - this_start[0]
-            yield this_start, last, this_vis_state, length, thread
-
-    def _longest_float(self, floats, front=True, cls=WarpThread):
-        " Used by compute_longest_floats "
-        lengths = [length for start, end, visible, length, thread in floats
-                   if visible == front and isinstance(thread, cls)]
-        # remove any that are same as warp length. Probably gaps in a gamp...
-        warp_len = len(self.warp) - 1
-        for i in range(lengths.count(warp_len)):
-            lengths.remove(warp_len)
-        if lengths:  # !!
-            return max(lengths)
-        else:
-            return 0
+        matrix = self.compute_drawdown_matrix()
+        # warp threads run along the columns of the matrix, visible when the warp is on top
+        # weft threads along the rows, visible when the warp is not on top
+        return Floats._from_index(self, _RunIndex(matrix), _RunIndex(matrix.T, invert=True))
+
+    def update_floats(self):
+        """
+        Bring computed_floats up to date with the changes made since it was last used.
+         - After editing a few threads only the drawdown columns/rows of those threads are
+           recomputed, and only their runs and the runs crossing them at those positions
+           are re-encoded, see _RunIndex.
+         - Anything else (new tieup, rising_shed, flips) recomputes everything.
+
+        Returns:
+            Floats: the same as computed_floats.
+        """
+        derived = self._derived_data()
+        floats = derived.get('computed_floats')
+        # bring the drawdown up to date first, rebuilding it marks the floats dirty
+        self.compute_drawdown_matrix()
+        dirty = self._dirty.get('floats')
+        if floats is None or dirty is None or dirty['all']:
+            floats = self.compute_float_arrays()
+        elif dirty['warp'] or dirty['weft']:
+            floats = self._update_floats(floats, dirty['warp'], dirty['weft'])
+        self._dirty['floats'] = _clean()
+        derived['computed_floats'] = floats
+        return floats
+
+    def _update_floats(self, floats, warp_range, weft_range):
+        " re-encode the runs of the changed threads, and of those crossing them, in floats "
+        matrix = self.compute_drawdown_matrix()
+        if floats._index is None or floats._index[0].shape != matrix.shape:
+            # threads were added or removed
+            return self.compute_float_arrays()
+        warp_index, weft_index = floats._index
+        if warp_range:
+            start, stop = warp_range
+            warp_index = warp_index.rows(start, stop, matrix[start:stop])
+            weft_index = weft_index.columns(start, stop, matrix.T)
+        if weft_range:
+            start, stop = weft_range
+            weft_index = weft_index.rows(start, stop, matrix[:, start:stop].T)
+            warp_index = warp_index.columns(start, stop, matrix)
+        return Floats._from_index(self, warp_index, weft_index)
+
+    def compute_floats(self):
+        """
+        Return an iterator over every float, yielding a tuple for each one::
+        (start, end, visible, length, thread)
+
+         - See compute_float_arrays() for the same data as arrays.
+        """
+        return iter(self.compute_float_arrays())
 
     def compute_longest_floats(self, front=True, back=False):
         """
@@ -604,25 +1984,107 @@ class Draft(object):
             front (bool): True and will process threads visible on the front,
             back (bool): True and will process threads visible on the back.
         """
-        floats = self.computed_floats
+        summary = self.float_summary
         longest = []
         if front:
-            longest.append(self._longest_float(floats, front, WarpThread))
-            longest.append(self._longest_float(floats, front, WeftThread))
+            longest.append(summary.longest(Floats.WARP, True))
+            longest.append(summary.longest(Floats.WEFT, True))
         if back:
-            longest.append(self._longest_float(floats, back, WarpThread))
-            longest.append(self._longest_float(floats, back, WeftThread))
+            longest.append(summary.longest(Floats.WARP, False))
+            longest.append(summary.longest(Floats.WEFT, False))
         return longest
 
-    def get_position(self, thread, start, end, boxsize, x_reversed=False):
+    def float_length_histogram(self, visible=True):
         """
-        Iterate over the threads calculating the proper position
-        for any given float to be drawn in the drawdown
+        Count of floats by the number of threads they cover, for the warp and weft.
 
-         - inefficient
-         - should be stored on thread like yarn_width or in compute_floats
+        Args:
+            visible (bool, optional): True for the front, False for the back.
+        Returns:
+            dict: of 'warp', 'weft' numpy arrays, index 1 is a single thread.
+        """
+        summary = self.float_summary
+        return {'warp': summary.histogram(Floats.WARP, visible),
+                'weft': summary.histogram(Floats.WEFT, visible)}
 
-        Change compute_floats() to return this also.
+    def float_length_grid(self, visible=True):
+        """
+        Length (end - start) of the float seen at every crossing on one side of the fabric.
+
+        Args:
+            visible (bool, optional): True for the front, False for the back.
+        Returns:
+            numpy.ndarray: shape (len(warp), len(weft)).
+        """
+        num_warp, num_weft = len(self.warp), len(self.weft)
+        floats = self.computed_floats
+        if not num_warp or not num_weft:
+            return np.zeros((num_warp, num_weft), dtype=np.intp)
+        # the runs of each axis tile their threads end to end, so repeating each float
+        # over the cells it covers lays them out in drawdown order
+        grids = []
+        for axis in (Floats.WARP, Floats.WEFT):
+            _, start, end, shown = floats.runs(axis)
+            cells = end - start + 1
+            grids.append((np.repeat(end - start, cells), np.repeat(shown, cells)))
+        (warp_length, warp_shown), (weft_length, _) = grids
+        shape = (num_warp, num_weft)
+        on_warp = warp_shown.reshape(shape) == bool(visible)
+        return np.where(on_warp, warp_length.reshape(shape), weft_length.reshape(num_weft, num_warp).T)
+
+    def float_heatmap(self, tile=8, visible=True):
+        """
+        Longest float seen in each tile of tile x tile crossings, for screening
+        drafts for long floats in any one area.
+
+        Args:
+            tile (int, optional): number of threads along each side of a tile,
+            visible (bool, optional): True for the front, False for the back.
+        Returns:
+            numpy.ndarray: shape (ceil(len(warp)/tile), ceil(len(weft)/tile)), by warp then weft.
+        """
+        grid = self.float_length_grid(visible)
+        rows = -(-grid.shape[0] // tile)
+        cols = -(-grid.shape[1] // tile)
+        padded = np.zeros((rows * tile, cols * tile), dtype=grid.dtype)
+        padded[:grid.shape[0], :grid.shape[1]] = grid
+        return padded.reshape(rows, tile, cols, tile).max(axis=(1, 3))
+
+    def build_position_index(self):
+        """
+        Build prefix sums of yarn_width along the warp and weft so the drawn
+        position of any float is a constant time lookup.
+         - Called from calculate_box_sizing() once yarn_width is set on every thread.
+         - Discarded by invalidate_drawdown().
+        """
+        # keep integer widths as integers so pixel positions stay whole numbers
+        warp_repeats, weft_repeats = self.repeats
+        warp_widths = np.tile(np.array(self._column('warp', 'yarn_width') or [0]), warp_repeats)[:len(self.warp)]
+        weft_widths = np.tile(np.array(self._column('weft', 'yarn_width') or [0]), weft_repeats)[:len(self.weft)]
+        self._position_index = {
+            # edges[i] is the total width of threads before thread i
+            "warp_edges": np.concatenate([[0], np.cumsum(warp_widths)]),
+            "weft_edges": np.concatenate([[0], np.cumsum(weft_widths)]),
+            # spacing is nan (None) or a size, 0 counts as unspaced
+            "warp_spaced": np.tile(_spaced(self._warp['spacing']), warp_repeats),
+            "weft_spaced": np.tile(_spaced(self._weft['spacing']), weft_repeats),
+        }
+        return self._position_index
+
+    @property
+    def position_index(self):
+        """
+        dict: The prefix sums from build_position_index(), built on first use.
+        """
+        if self._position_index is None:
+            self.build_position_index()
+        return self._position_index
+
+    def get_position(self, thread, start, end, boxsize, x_reversed=False):
+        """
+        Return the proper position for any given float to be drawn in the drawdown.
+         - Uses the prefix sums from build_position_index().
+         - warp is counted from the right hand side.
 
         Args:
             thread (WarpThread | WeftThread): thread to test,
@@ -632,34 +2094,14 @@ class Draft(object):
             x_reversed (bool): False means count from the right hand side.
         """
         num_warp_threads = len(self.warp)
-        # reversed for back of cloth
-        step = -1
-        if x_reversed:
-            step = 1
-        # if isinstance(thread, WarpThread):
-            # print(thread,thread.spacing,thread.yarn_width) #!
         if thread.spacing:
-            # starty (step through the wefts)
-            w = 0
-            for i in range(start[1]):
-                w += self.weft[i].yarn_width
-            starty = w
-            # endy
-            w = 0
-            for i in range(end[1] + 1):
-                w += self.weft[i].yarn_width
-            endy = w
-            # startx (step through the warps)
-            w = 0
-            for i in range(num_warp_threads - 1, end[0], -1):
-                w += self.warp[i].yarn_width
-            startx = w
-            # endx
-            w = 0
-            for i in range(num_warp_threads - 1, start[0] - 1, -1):
-                w += self.warp[i].yarn_width
-            endx = w
-
+            index = self.position_index
+            warp_edges = index["warp_edges"]
+            weft_edges = index["weft_edges"]
+            starty = weft_edges[start[1]]
+            endy = weft_edges[end[1] + 1]
+            startx = warp_edges[-1] - warp_edges[end[0] + 1]
+            endx = warp_edges[-1] - warp_edges[start[0]]
         else:  # no spacing info so use pixels_per_square (boxsize)
             startx = (num_warp_threads - end[0] - 1) * boxsize
             starty = start[1] * boxsize
@@ -670,13 +2112,88 @@ class Draft(object):
         result_end = (endx, endy)
         return (result_start, result_end)
 
+    def float_rectangles(self, floats, boxsize):
+        """
+        Bulk version of get_position() for every float at once.
+
+        Args:
+            floats (Floats): from compute_float_arrays(),
+            boxsize: used for threads without spacing.
+        Returns:
+            numpy.ndarray: shape (len(floats), 4) of startx, starty, endx, endy per float.
+        """
+        index = self.position_index
+        warp_edges = index["warp_edges"]
+        weft_edges = index["weft_edges"]
+        num_warp_threads = len(self.warp)
+        on_warp = floats.axis == Floats.WARP
+        # (x, y) of the start and end cells
+        x0 = np.where(on_warp, floats.thread, floats.start)
+        x1 = np.where(on_warp, floats.thread, floats.end)
+        y0 = np.where(on_warp, floats.start, floats.thread)
+        y1 = np.where(on_warp, floats.end, floats.thread)
+        spaced = np.empty(len(floats), dtype=bool)
+        spaced[on_warp] = index["warp_spaced"][floats.thread[on_warp]]
+        spaced[~on_warp] = index["weft_spaced"][floats.thread[~on_warp]]
+        rects = np.empty((len(floats), 4), dtype=np.result_type(warp_edges, weft_edges, boxsize))
+        rects[:, 0] = np.where(spaced, warp_edges[-1] - warp_edges[x1 + 1], (num_warp_threads - x1 - 1) * boxsize)
+        rects[:, 1] = np.where(spaced, weft_edges[y0], y0 * boxsize)
+        rects[:, 2] = np.where(spaced, warp_edges[-1] - warp_edges[x0], (num_warp_threads - x0) * boxsize)
+        rects[:, 3] = np.where(spaced, weft_edges[y1 + 1], (y1 + 1) * boxsize)
+        return rects
+
     def reduce_shafts(self):
         """
         Optimize to use the fewest number of shafts, to attempt to make a
         complex draft possible to weave on a loom with fewer shafts. Note that
         this may make the threading more complex or less periodic.
+         - Shafts that lift together on every pick are merged, shafts without
+           warp threads removed.
         """
-        raise NotImplementedError
+        num_shafts = len(self.shafts)
+        lifts = self._lift_rows(0, len(self._weft['color']), self._tieup_matrix())
+        threading = _column_array(self._warp['shaft'], np.int16).astype(np.intp)
+        used = np.zeros(num_shafts, dtype=bool)
+        used[threading[threading >= 0]] = True
+        used_shafts = np.flatnonzero(used)
+        classes = _classes(lifts[:, used_shafts])
+        # new shaft of each old one, and the old shaft standing for each new one
+        new_shaft = np.full(num_shafts + 1, -1, dtype=np.intp)  # last for unthreaded (-1)
+        new_shaft[used_shafts] = classes
+        kept = used_shafts[np.unique(classes, return_index=True)[1]]
+
+        tieup = self._tieup_matrix()[:, kept]
+        self._warp['shaft'] = array('h', new_shaft[threading].astype(np.int16).tobytes())
+        liftplan = _mask_matrix(self._weft['shafts'], num_shafts)
+        self._weft['shafts'] = _matrix_column(liftplan[:, kept])
+        self._shared.difference_update([('warp', 'shaft'), ('weft', 'shafts')])
+        # picks only lifting removed shafts must not fall back to their treadles
+        treadles = self._column('weft', 'treadles')
+        for pick in np.flatnonzero(liftplan.any(axis=1) & ~liftplan[:, kept].any(axis=1)):
+            treadles[pick] = 0
+        self.shafts = [Shaft(i + 1) for i in range(len(kept))]
+        for treadle, shafts in zip(self.treadles, tieup):
+            treadle.shafts = set(self.shafts[i] for i in np.flatnonzero(shafts))
+        self.invalidate_drawdown()
+
+    def _set_treadles(self, treadling, tieup):
+        " replace the treadles and treadling with boolean arrays (picks x treadles), (treadles x shafts) "
+        self.treadles = [Treadle(i + 1, set(self.shafts[j] for j in np.flatnonzero(shafts)), self)
+                         for i, shafts in enumerate(tieup)]
+        self._weft['treadles'] = _matrix_column(treadling)
+        self._shared.discard(('weft', 'treadles'))
+        self.invalidate_drawdown()
+
+    def _treadle_per_lift(self):
+        " treadling and tieup with one treadle for each different (non empty) lift "
+        lifts = self._lift_rows(0, len(self._weft['color']), self._tieup_matrix())
+        # no treadle for picks lifting nothing
+        picks = np.flatnonzero(lifts.any(axis=1))
+        classes = _classes(lifts[picks].T)
+        treadling = np.zeros((len(lifts), len(np.unique(classes))), dtype=bool)
+        treadling[picks, classes] = True
+        tieup = lifts[picks[np.unique(classes, return_index=True)[1]]]
+        return treadling, tieup
 
     def reduce_treadles(self):
         """
@@ -684,10 +2201,29 @@ class Draft(object):
         a complex draft possible to weave on a loom with a smaller number of
         treadles. Note that this may require that more treadles are active on
         any given pick.
+         - Unused treadles are removed, treadles tied up alike or always used
+           together are merged. One treadle for each different lift is used instead
+           if that needs fewer.
 
         Cannot be called on a liftplan draft.
         """
-        raise NotImplementedError
+        if self.liftplan:
+            raise ValueError("can't reduce treadles on a liftplan draft")
+        tieup = self._tieup_matrix()
+        treadling = _mask_matrix(self._weft['treadles'], len(self.treadles))
+        while True:
+            used = treadling.any(axis=0)
+            treadling, tieup = treadling[:, used], tieup[used]
+            for classes in (_classes(tieup.T), _classes(treadling)):
+                if len(classes) and classes.max() + 1 < len(classes):
+                    treadling, tieup = _merge_classes(treadling, tieup, classes)
+                    break
+            else:
+                break
+        per_lift = self._treadle_per_lift()
+        if len(per_lift[1]) < len(tieup):
+            treadling, tieup = per_lift
+        self._set_treadles(treadling, tieup)
 
     def reduce_active_treadles(self):
         """
@@ -699,17 +2235,7 @@ class Draft(object):
         """
         if self.liftplan:
             raise ValueError("can't reduce treadles on a liftplan draft")
-        if True or max(len(thread.treadles) for thread in self.weft) > 1:
-            used_shaft_combos = defaultdict(list)
-            for thread in self.weft:
-                used_shaft_combos[frozenset(thread.connected_shafts)].\
-                    append(thread)
-            self.treadles = []
-            for shafts, threads in used_shaft_combos.items():
-                treadle = Treadle(shafts=set(shafts))
-                self.treadles.append(treadle)
-                for thread in threads:
-                    thread.treadles = set([treadle])
+        self._set_treadles(*self._treadle_per_lift())
 
     def sort_threading(self):
         """
@@ -745,15 +2271,71 @@ class Draft(object):
         """
         self.rising_shed = not self.rising_shed
         for thread in self.weft:
-            thread.shafts = self.shafts - thread.shafts
+            # picks on one treadle are inverted through the tieup, others
+            # (several treadles or none) are given the inverted lift as a liftplan
+            if thread.shafts or len(thread.treadles) != 1:
+                thread.shafts = set(self.shafts) - thread.connected_shafts
+                if not thread.shafts:  # lifts nothing, so no treadles either
+                    thread.treadles = set()
         for treadle in self.treadles:
-            treadle.shafts = self.shafts - treadle.shafts
+            treadle.shafts = set(self.shafts) - treadle.shafts
+        self.invalidate_drawdown()
 
     def rotate(self):
         """
         Rotate the draft: the weft becomes the warp, and vice versa.
-        """
-        raise NotImplementedError
+         - The same face stays up, so rising_shed is inverted.
+         - Thread colors, spacing and repeats move across without copying, the
+           threading and treadling change places and the tieup is transposed.
+         - A treadled draft with one treadle per pick swaps its shafts and treadles,
+           otherwise each different lift becomes a shaft. A liftplan draft stays one.
+        """
+        tieup = self.tieup_masks()
+        warp, weft = self._warp, self._weft
+        lifts = [_lift_mask(shafts, treadles, tieup) for shafts, treadles in zip(weft['shafts'], weft['treadles'])]
+        if not self.liftplan and not any(weft['shafts']) and \
+                all(not treadles & (treadles - 1) for treadles in weft['treadles']):
+            # each pick's treadle becomes the shaft of the new warp thread
+            rows = tieup
+            threading = [treadles.bit_length() - 1 for treadles in weft['treadles']]
+        else:
+            rows = sorted(set(lifts) - {0})
+            index = dict((mask, i) for i, mask in enumerate(rows))
+            threading = [index.get(mask, -1) for mask in lifts]
+        # each old shaft lifts the new shafts whose row uses it
+        column = _mask_column(len(self.shafts))
+        column.extend(rows)
+        transposed = [_to_mask(np.flatnonzero(shafts), None) for shafts in _mask_matrix(column, len(self.shafts)).T]
+        old_threading = _column_array(warp['shaft'], np.int16)
+
+        self.shafts = [Shaft(i + 1) for i in range(len(rows))]
+        shafts = _mask_column(len(self.shafts))
+        if self.liftplan:
+            self.treadles = []
+            lift_table = np.array(transposed + [0], dtype=object)
+            shafts.extend(lift_table[old_threading].tolist())
+            treadles = _mask_column(0)
+            treadles.extend([0] * len(old_threading))
+        else:
+            self.treadles = [Treadle(i + 1, set(self.shafts[b] for b in range(len(rows)) if mask >> b & 1), self)
+                             for i, mask in enumerate(transposed)]
+            shafts.extend([0] * len(old_threading))
+            treadles = _mask_column(len(self.treadles))
+            treadles.extend(0 if shaft < 0 else 1 << int(shaft) for shaft in old_threading)
+
+        self._warp = dict((name, column) for name, column in weft.items() if name not in ('shafts', 'treadles'))
+        self._warp['shaft'] = array('h', threading)
+        self._weft = dict((name, column) for name, column in warp.items() if name != 'shaft')
+        self._weft['shafts'] = shafts
+        self._weft['treadles'] = treadles
+        other = {'warp': 'weft', 'weft': 'warp'}
+        self._shared = set((other[item[0]], item[1]) if isinstance(item, tuple) else item
+                           for item in self._shared)
+        self._repeats = {'warp': self._repeats['weft'], 'weft': self._repeats['warp']}
+        self.warp_units, self.weft_units = self.weft_units, self.warp_units
+        self.rising_shed = not self.rising_shed
+        self._lookup_cache.clear()
+        self.invalidate_drawdown()
 
     def flip_weftwise(self):
         """
@@ -762,6 +2344,7 @@ class Draft(object):
         the left.
         """
         self.warp.reverse()
+        self.invalidate_drawdown()
 
     def flip_warpwise(self):
         """
@@ -770,6 +2353,7 @@ class Draft(object):
         the near.
         """
         self.weft.reverse()
+        self.invalidate_drawdown()
 
     def selvedges_continuous(self):
         """
@@ -784,6 +2368,20 @@ class Draft(object):
         Check whether the selvedge corresponding to the lowest-number thread is
         continuous.
         """
+        shaft = self._warp['shaft'][0] if low else self._warp['shaft'][-1]
+        return not self.selvedge_failures(low)[shaft]
+
+    def selvedge_failures(self, low, lifts=None):
+        """
+        For a selvedge thread on each shaft, count the pairs of picks on which it
+        would not be caught, all shafts at once. 0 means continuous.
+
+        Args:
+            low (bool): True for the selvedge at the lowest-number thread,
+            lifts (numpy.ndarray, optional): from compute_lift_matrix(), if already known.
+        Returns:
+            numpy.ndarray: of len(shafts) + 1 counts, the last one for an unthreaded selvedge.
+        """
         # For the low selvedge:
         # If this draft starts at the lowest thread, there needs to be a
         # transition between threads 1 and 2 (0-indexed), threads 3 and 4, etc.
@@ -793,18 +2391,47 @@ class Draft(object):
         # For the high selvedge:
         # If this draft starts at the highest thread, there needs to be a
         # transition between threads 0 and 1, threads 2 and 3, etc.
-
         offset = 0 if low ^ self.start_at_lowest_thread else 1
-        if low:
-            thread = self.warp[0]
-        else:
-            thread = self.warp[-1]
-        for ii in range(offset, len(self.weft) - 1, 2):
-            a_state = thread.shaft in self.weft[ii].connected_shafts
-            b_state = thread.shaft in self.weft[ii + 1].connected_shafts
-            if not a_state ^ b_state:
-                return False
-        return True
+        if lifts is None:
+            lifts = self.compute_lift_matrix()
+        # an unthreaded selvedge is never lifted
+        lifts = np.hstack([lifts, np.zeros((len(lifts), 1), dtype=bool)])
+        pairs = max(len(lifts) - offset, 0) // 2
+        first = lifts[offset:offset + 2 * pairs:2]
+        second = lifts[offset + 1:offset + 2 * pairs:2]
+        return np.count_nonzero(first == second, axis=0)
+
+    def rank_selvedges(self, floating=True):
+        """
+        Rank every choice of shaft for the two selvedge threads, best first.
+         - The selvedges are independent, so every pair is scored from one
+           selvedge_failures() pass for each side.
+         - A floating selvedge (None) is never missed, but ranks after a threaded
+           selvedge that is also continuous.
+
+        Args:
+            floating (bool, optional): include floating selvedges as options.
+        Returns:
+            list: of (failures, low Shaft or None, high Shaft or None), fewest failures first.
+        """
+        lifts = self.compute_lift_matrix()
+        options = list(self.shafts) + ([None] if floating else [])
+        scores = []
+        for low in (True, False):
+            failures = self.selvedge_failures(low, lifts)[:len(self.shafts)]
+            if floating:
+                failures = np.append(failures, 0)
+            scores.append(failures)
+        low_scores, high_scores = scores
+        total = low_scores[:, None] + high_scores[None, :]
+        # prefer threaded selvedges when equally good
+        size = len(options)
+        floats = np.zeros(size, dtype=np.intp)
+        if floating:
+            floats[-1] = 1
+        ranks = np.lexsort((np.tile(np.arange(size), size), np.repeat(np.arange(size), size),
+                            (floats[:, None] + floats[None, :]).ravel(), total.ravel()))
+        return [(int(total.flat[rank]), options[rank // size], options[rank % size]) for rank in ranks]
 
     def make_selvedges_continuous(self, add_new_shafts=False):
         """
@@ -818,39 +2445,66 @@ class Draft(object):
         subjectively "best" solution in terms of aesthetics and structure. For
         example, it may result in longer floats than necessary.
         """
+        lifts = self.compute_lift_matrix()
         for low_thread in (False, True):
-            success = False
             if low_thread:
                 warp_thread = self.warp[0]
             else:
                 warp_thread = self.warp[-1]
-            if self.selvedge_continuous(low_thread):
-                success = True
+            failures = self.selvedge_failures(low_thread, lifts)
+            if not failures[self._shaft_index(warp_thread.shaft)]:
                 continue
-            for shaft in self.shafts:
-                warp_thread.shaft = shaft
-                if self.selvedge_continuous(low_thread):
-                    success = True
-                    break
-            if not success:
-                if add_new_shafts:
-                    raise NotImplementedError
-                else:
-                    raise DraftError("cannot make continuous selvedges")
+            continuous = np.flatnonzero(failures[:len(self.shafts)] == 0)
+            if len(continuous):
+                warp_thread.shaft = self.shafts[continuous[0]]
+            elif add_new_shafts:
+                raise NotImplementedError
+            else:
+                raise DraftError("cannot make continuous selvedges")
 
     def compute_weft_crossings(self):
         """
-        Iterate over each weft row and compute the total number of thread
-        crossings in that row. Useful for determining sett.
+        Compute the total number of thread crossings (changes between over and
+        under) along each weft row. Useful for determining sett.
+
+        Returns:
+            numpy.ndarray: of int, one count per pick.
         """
-        raise NotImplementedError
+        matrix = self.compute_drawdown_matrix()
+        return np.count_nonzero(matrix[1:] != matrix[:-1], axis=0)
 
     def compute_warp_crossings(self):
         """
-        Iterate over each warp row and compute the total number of thread
-        crossings in that row.
+        Compute the total number of thread crossings along each warp thread.
+        Useful for estimating take-up.
+
+        Returns:
+            numpy.ndarray: of int, one count per warp thread.
+        """
+        matrix = self.compute_drawdown_matrix()
+        return np.count_nonzero(matrix[:, 1:] != matrix[:, :-1], axis=1)
+
+    def crossing_stats(self):
         """
-        raise NotImplementedError
+        Summary of the crossings from compute_warp_crossings() and compute_weft_crossings().
+
+        Returns:
+            dict: of 'warp', 'weft' dicts of 'min', 'max', 'mean' crossings per thread and
+            'total', and 'interlacement': crossings per drawdown cell (0 to 2).
+        """
+        stats = {}
+        cells = len(self.warp) * len(self.weft)
+        total = 0
+        for axis, crossings in (('warp', self.compute_warp_crossings()),
+                                ('weft', self.compute_weft_crossings())):
+            count = int(crossings.sum())
+            total += count
+            stats[axis] = {'min': int(crossings.min()) if len(crossings) else 0,
+                           'max': int(crossings.max()) if len(crossings) else 0,
+                           'mean': count / len(crossings) if len(crossings) else 0.0,
+                           'total': count}
+        stats['interlacement'] = total / cells if cells else 0.0
+        return stats
 
     def get_mini_stats(self):
         """
@@ -864,7 +2518,7 @@ class Draft(object):
         """
         # Threadcounts
         stats = ["Threadcounts: Warp %d  Weft %d" % (len(self.warp), len(self.weft))]
-        unique_thread_count = len(self.thread_stats["unique_threads"])
+        unique_thread_count = len(self.thread_counts["unique_threads"])
         # Shaft and treadle counts
         shafts = "%d shafts." % len(self.shafts)
         if not self.liftplan:
@@ -897,10 +2551,19 @@ class Draft(object):
         stats.append(msg)
         return stats
 
-    def repeat(self, n):
+    def repeat(self, n, virtual=False):
         """
         Given a base draft, make it repeat with N units in each direction.
+         - Adds n copies of the threads to the warp and weft.
+
+        Args:
+            n (int): number of copies to add,
+            virtual (bool, optional): True to keep one copy of the threads and a repeat count.
+                The repeats are expanded with materialize() when a thread is changed.
         """
+        if virtual:
+            self.add_virtual_repeats(warp=n, weft=n)
+            return
         initial_warp = list(self.warp)
         initial_weft = list(self.weft)
         for ii in range(n):
@@ -908,14 +2571,157 @@ class Draft(object):
                 self.add_warp_thread(
                     color=thread.color,
                     shaft=thread.shaft,
+                    spacing=thread.spacing,
                 )
             for thread in initial_weft:
                 self.add_weft_thread(
                     color=thread.color,
                     treadles=thread.treadles,
                     shafts=thread.shafts,
+                    spacing=thread.spacing,
                 )
 
+    def add_virtual_repeats(self, warp=0, weft=0):
+        """
+        Repeat the warp and/or weft without storing the extra threads. The threads of
+        every repeat are views onto the first one, until a thread is changed.
+
+        Args:
+            warp (int, optional): number of copies of the warp to add,
+            weft (int, optional): number of copies of the weft to add.
+        """
+        for axis, copies in (('warp', warp), ('weft', weft)):
+            if copies:
+                threads = getattr(self, axis)
+                size = len(threads)
+                self._repeats[axis] *= copies + 1
+                self.mark_dirty(axis, size, len(threads))
+        self._position_index = None
+
+    def _unit_sequence(self, axis, values):
+        " RunSequence of the values of one repeat of axis, repeated as the draft is "
+        return RunSequence.from_values(values, self._repeats[axis])
+
+    def _set_sequence(self, axis, name, sequence, encode=int, transform=None):
+        """
+        Store a RunSequence in a column of the warp or weft. encode() turns each run value
+        into a column value, transform() the expanded array. An empty warp or weft is given
+        new threads.
+        """
+        threads = getattr(self, axis)
+        columns = getattr(self, '_' + axis)
+        added = not len(threads)
+        if added:
+            blanks = {'color': NO_COLOR, 'spacing': float('nan'), 'shaft': -1, 'shafts': 0,
+                      'treadles': 0, 'css_hash': -1}
+            for column_name in list(columns):
+                self._column(axis, column_name).extend([blanks.get(column_name)] * len(sequence.unit))
+            self._repeats[axis] = sequence.repeats
+        elif len(sequence) != len(threads):
+            raise DraftError("%s has %d threads, not %d" % (axis, len(threads), len(sequence)))
+        elif sequence.repeats != self._repeats[axis]:
+            self._materialize(axis)
+            sequence = RunSequence(sequence.runs * sequence.repeats)
+        values = RunSequence([(encode(value), step, count) for value, step, count in sequence.unit.runs]).array()
+        if transform:
+            values = transform(values)
+        column = self._column(axis, name)
+        if isinstance(column, array):
+            column[:] = array(column.typecode, values.astype(column.typecode).tobytes())
+        else:
+            column[:] = [int(value) for value in values]
+        if added or name != 'color':
+            self._position_index = None
+            self.mark_dirty(axis)
+        else:
+            self._touch()
+
+    def threading_sequence(self):
+        """
+        The threading as a RunSequence of zero based shafts, -1 for an unthreaded end.
+
+        Returns:
+            RunSequence: of len(warp) values.
+        """
+        return self._unit_sequence('warp', self._warp['shaft'])
+
+    def set_threading(self, sequence):
+        """
+        Thread the warp from a RunSequence of zero based shafts (-1 for none).
+         - An empty warp is given threads without color, keeping the sequence's repeats.
+
+        Args:
+            sequence (RunSequence): one shaft per warp thread.
+        """
+        size = len(self.shafts)
+        values = sequence.unit.array()
+        if len(values) and not -1 <= values.min() <= values.max() < size:
+            raise DraftError("threading uses a shaft this draft does not have")
+        self._set_sequence('warp', 'shaft', sequence)
+
+    def treadling_sequence(self):
+        """
+        The treadling as a RunSequence of zero based treadles, -1 for a pick without one.
+         - Only for drafts treadling one treadle per pick.
+
+        Returns:
+            RunSequence: of len(weft) values.
+        """
+        if self.liftplan:
+            raise DraftError("a liftplan draft has no treadling")
+        treadles = []
+        for mask in self._weft['treadles']:
+            if mask & (mask - 1):
+                raise DraftError("treadling has picks with more than one treadle")
+            treadles.append(mask.bit_length() - 1)
+        return self._unit_sequence('weft', treadles)
+
+    def set_treadling(self, sequence):
+        """
+        Treadle the weft from a RunSequence of zero based treadles (-1 for none).
+         - An empty weft is given picks without color, keeping the sequence's repeats.
+
+        Args:
+            sequence (RunSequence): one treadle per pick.
+        """
+        if self.liftplan:
+            raise DraftError("a liftplan draft has no treadling")
+        size = len(self.treadles)
+        values = sequence.unit.array()
+        if len(values) and not -1 <= values.min() <= values.max() < size:
+            raise DraftError("treadling uses a treadle this draft does not have")
+        if isinstance(self._weft['treadles'], array):
+            def masks(treadles):
+                return np.where(treadles < 0, 0, np.left_shift(np.uint64(1), treadles.clip(0).astype(np.uint64)))
+        else:
+            def masks(treadles):
+                return [0 if treadle < 0 else 1 << int(treadle) for treadle in treadles]
+        self._set_sequence('weft', 'treadles', sequence, transform=masks)
+
+    def color_sequence(self, axis):
+        """
+        The color order of the warp or weft.
+
+        Args:
+            axis (str): 'warp' or 'weft'.
+        Returns:
+            RunSequence: of Color (None for no color), one per thread.
+        """
+        colors = [None if index == NO_COLOR else self.palette[index]
+                  for index in getattr(self, '_' + axis)['color']]
+        return self._unit_sequence(axis, colors)
+
+    def set_color_sequence(self, axis, sequence):
+        """
+        Color the warp or weft from a RunSequence of Colors (or rgb tuples, None for no color).
+         - An empty warp or weft is given unthreaded threads, keeping the sequence's repeats.
+
+        Args:
+            axis (str): 'warp' or 'weft',
+            sequence (RunSequence): one color per thread.
+        """
+        self._set_sequence(axis, 'color', sequence, self._color_index)
+
     def advance(self):
         """
         Given a base draft, make it 'advance'. Essentially:
@@ -960,4 +2766,20 @@ class Draft(object):
         Check whether all threads (weft and warp) will be "attached" to the
         fabric, instead of just falling off.
         """
-        raise NotImplementedError
+        detached = self.detached_threads()
+        return not (len(detached['warp']) or len(detached['weft']))
+
+    def detached_threads(self):
+        """
+        Find the threads that are not held in the cloth: warp threads floating the
+        whole length, and empty or fully lifted picks.
+         - A thread is held if it changes sides somewhere, as it is then interlaced with
+           the threads it passes between. So a thread is detached exactly when its
+           row or column of the drawdown is all True or all False.
+
+        Returns:
+            dict: of 'warp', 'weft' numpy arrays of thread indexes.
+        """
+        matrix = self.compute_drawdown_matrix()
+        return {'warp': np.flatnonzero(matrix.all(axis=1) | ~matrix.any(axis=1)),
+                'weft': np.flatnonzero(matrix.all(axis=0) | ~matrix.any(axis=0))}
@@ -3,10 +3,11 @@
 import os.path
 import sys
 import json
-from .Color import Color, WHITE, BLACK, MID
+from .Color import Color, ColorCache, color_cache, WHITE, BLACK, MID
 from .Drawstyle import Drawstyle
-from .Draft import WarpThread, WeftThread, Shaft, Treadle, Draft
+from .Draft import WarpThread, WeftThread, Shaft, Treadle, Draft, Floats, FloatSummary
 from .repeats import find_repeats, find_mirrors, find_mirrors_repeats, prune_pattern
+from .sequences import RunSequence
 
 __version__ = '0.5'
 
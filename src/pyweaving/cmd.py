@@ -7,8 +7,9 @@ import os.path
 from os import getcwd
 import glob  # finding numerically suffixed files in generate_unique_filename()
 
-from . import Draft, instructions, get_style
+from . import Draft, Floats, instructions, get_style
 from .wif import WIFReader, WIFWriter
+from .npz import NPZReader, NPZWriter
 from .render import ImageRenderer, SVGRenderer
 from .generators.tartan import tartan
 from .generators.twill import twill
@@ -248,7 +249,7 @@ def remap_image(opts):
 
 def load_draft(infile):
     """
-    Load the draft file in wif or json format.
+    Load the draft file in wif, json or npz format.
      - return the Draft or false if not found or wrong type
     """
     if os.path.exists(infile):
@@ -257,9 +258,11 @@ def load_draft(infile):
         elif infile.endswith('.json'):
             with open(infile, 'r') as f:  # !! opt mode
                 return Draft.from_json(f.read())
+        elif infile.endswith('.npz'):
+            return NPZReader(infile).read()
         else:
             raise ValueError(
-                "filename %r unrecognized: .wif and .json are supported" %
+                "filename %r unrecognized: .wif, .json and .npz are supported" %
                 infile)
     else:
         print("File not found:", infile)
@@ -297,16 +300,16 @@ def render(opts):
                 if opts.outfile.endswith('.svg'):
                     SVGRenderer(draft, style, opts.liftplan, opts.structure).save(opts.outfile)
                 elif opts.outfile.endswith('.png'):
-                    ImageRenderer(draft, style, opts.liftplan, opts.structure).save(opts.outfile)
+                    ImageRenderer(draft, style, opts.liftplan, opts.structure, opts.heatmap).save(opts.outfile)
                 else:
                     print("File extension not recognised", opts.outfile)
             else:  # no outfile specified - show it
-                ImageRenderer(draft, style, opts.liftplan, opts.structure).show()
+                ImageRenderer(draft, style, opts.liftplan, opts.structure, opts.heatmap).show()
 
 
 def convert(opts):
     """
-    Convert wif to json or back.
+    Convert between wif, json and npz.
      - (Also can wif to wif if need to rewrite file)
     """
     draft = load_draft(opts.infile)
@@ -316,6 +319,8 @@ def convert(opts):
         elif opts.outfile.endswith('.json'):
             with io.open(opts.outfile, 'w', encoding='utf-8') as f:
                 f.write(draft.to_json())
+        elif opts.outfile.endswith('.npz'):
+            NPZWriter(draft).write(opts.outfile)
 
 
 def thread(opts):
@@ -361,7 +366,8 @@ def stats(opts):
     """
     draft = load_draft(opts.infile)
     if draft:
-        warp_longest, weft_longest = draft.compute_longest_floats()
+        summary = draft.float_summary
+        warp_longest, weft_longest = summary.longest(Floats.WARP), summary.longest(Floats.WEFT)
         print("Title:", draft.title)
         print("Author:", draft.author)
         print("Address:", draft.address)
@@ -402,6 +408,7 @@ def main(argv=sys.argv):
     p_render.add_argument('--floats', type=int, default=0, help='Highlight floats above this size.')
     p_render.add_argument('--style', default='Default', help='Use a named style from styles.json in ~/.pyweaving directory.')
     p_render.add_argument('--structure', action='store_true', help='Warp is Black, Weft is white.')
+    p_render.add_argument('--heatmap', type=int, default=0, help='Shade the longest floats in tiles of this many threads.')
     p_render.set_defaults(function=render)
 
     p_convert = subparsers.add_parser(
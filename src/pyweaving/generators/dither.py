@@ -3,7 +3,7 @@ from __future__ import (absolute_import, division, print_function,
 
 from operator import itemgetter
 
-from .. import Color
+from .. import color_cache
 
 
 def diff_rgb(a, b):
@@ -44,7 +44,7 @@ def dithered_gradient(start_color, end_color, count):
                           for ideal_ch, error_ch in
                           zip(ideal_rgb, error_rgb)]
         this_rgb = closest(with_error_rgb, start_color.rgb, end_color.rgb)
-        threads.append(Color(this_rgb))
+        threads.append(color_cache.get(this_rgb))
         error_rgb = add_rgb(error_rgb, diff_rgb(this_rgb, ideal_rgb))
 
     return threads
@@ -1,5 +1,5 @@
 
-from .. import Draft, Color, __version__, find_repeats
+from .. import Draft, Color, color_cache, __version__, find_repeats
 from PIL import Image, ImageFilter
 from copy import deepcopy
 from collections import namedtuple
@@ -355,7 +355,7 @@ def point_threaded(image_filename, shafts=40, repeats=2,
                 shaft = ii
             else:
                 shaft = warp_pattern_size - ii
-            draft.add_warp_thread(color=Color(warp_color), shaft=shaft)
+            draft.add_warp_thread(color=color_cache.get(warp_color), shaft=shaft)
     #
     imdata = im.getdata()
 
@@ -367,7 +367,7 @@ def point_threaded(image_filename, shafts=40, repeats=2,
                 pixel = imdata[offset + xx]
                 if not pixel:
                     pick_shafts.add(xx)
-            draft.add_weft_thread(color=Color(weft_color), shafts=pick_shafts)
+            draft.add_weft_thread(color=color_cache.get(weft_color), shafts=pick_shafts)
     #
     draft.title = image_filename+" Draft"
     draft.draft_title = [draft.title]
@@ -1,6 +1,7 @@
 
 import re
 import os.path
+from math import gcd
 
 from .. import Draft, get_project_root, __version__
 
@@ -90,6 +91,22 @@ def sett_in_STR_form(sett):
         return False
 
 
+def stored_repeats(colors, repeats, shaft_count):
+    """
+    How many repeats of the sett to store before the twill lines up again,
+    the rest can be virtual repeats.
+
+    Args:
+        colors (list): (color, count) pairs of the sett,
+        repeats (int): Number of times to repeat the sett,
+        shaft_count (int): shafts in the twill.
+    """
+    period = shaft_count // gcd(sum(count for color, count in colors), shaft_count)
+    if repeats > period and repeats % period == 0:
+        return period
+    return repeats
+
+
 def tartan(sett, repeats=1, direction="z"):
     """
     Tartan generator
@@ -143,7 +160,8 @@ def tartan(sett, repeats=1, direction="z"):
 
         thread_no = 0
         # warp
-        for ii in range(repeats):
+        warp_stored = stored_repeats(warp_colors, repeats, shaft_count)
+        for ii in range(warp_stored):
             for color, count in warp_colors:
                 for jj in range(count, 0, -1):
                     s = thread_no % shaft_count
@@ -156,7 +174,8 @@ def tartan(sett, repeats=1, direction="z"):
         if not weft_colors:
             weft_colors = warp_colors
         #
-        for ii in range(repeats):
+        weft_stored = stored_repeats(weft_colors, repeats, shaft_count)
+        for ii in range(weft_stored):
             for color, count in weft_colors:
                 for jj in range(count):
                     t = thread_no % shaft_count
@@ -165,6 +184,8 @@ def tartan(sett, repeats=1, direction="z"):
                         treadles=[t],
                     )
                     thread_no += 1
+        if repeats:
+            draft.add_virtual_repeats(warp=repeats // warp_stored - 1, weft=repeats // weft_stored - 1)
         #
         draft.title = name.replace(", ", "_").replace(" ", "_").replace("__", "_")
         draft.title = draft.title.replace(",", "_").replace(" ", "_")
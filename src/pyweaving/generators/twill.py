@@ -52,8 +52,8 @@ def twill(shape="2/2", repeats=4, warp_color=(255, 255, 255),
                 index += 1
             index += weft  # skip these unset treadles
 
-    # Threading
-    for ii in range(repeats * size):
+    # Threading, one repeat stored and the rest virtual
+    for ii in range(min(repeats, 1) * size):
         draft.add_warp_thread(
             color=warp_color,
             shaft=ii % shafts,
@@ -63,6 +63,8 @@ def twill(shape="2/2", repeats=4, warp_color=(255, 255, 255),
             color=weft_color,
             treadles=[ii % shafts],
         )
+    if repeats > 1:
+        draft.add_virtual_repeats(warp=repeats - 1, weft=repeats - 1)
 
     draft.title = shape + " "+direction+" Twill"
     draft.draft_title = [draft.title]
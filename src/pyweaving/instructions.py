@@ -12,13 +12,15 @@ def print_shafts(draft, weft_shafts, visual_height=5):
 
     Args:
         draft (Draft): The draft.
-        weft_shafts (list): connected_shafts of the weft thread
+        weft_shafts (list|int): connected_shafts of the weft thread, or its connected_mask
         visual_height(int, optional): how big (number of lines) on screen to make the display.
     """
-    up_shafts = [' ' if shaft in weft_shafts else '#'
-                 for shaft in draft.shafts]
-    down_shafts = ['#' if shaft in weft_shafts else ' '
-                   for shaft in draft.shafts]
+    if isinstance(weft_shafts, int):
+        lifted = [bool(weft_shafts >> ii & 1) for ii in range(len(draft.shafts))]
+    else:
+        lifted = [shaft in weft_shafts for shaft in draft.shafts]
+    up_shafts = [' ' if up else '#' for up in lifted]
+    down_shafts = ['#' if up else ' ' for up in lifted]
     up_lines = '  '.join((c * 4) for c in up_shafts)
     down_lines = '  '.join((c * 4) for c in down_shafts)
     print()
@@ -212,7 +214,7 @@ def weaving(draft, repeats, start_repeat, start_pick, save_filename=None):
             print((" " * max_shafts * visual_height) + "<--- SHUTTLE %s" % weft_color)
         else:
             print("%s SHUTTLE --->" % weft_color)
-        print_shafts(draft, weft_thread.connected_shafts)
+        print_shafts(draft, weft_thread.connected_mask)
 
         if save_filename:
             write_save_file(save_filename, {
@@ -0,0 +1,69 @@
+import json
+
+import numpy as np
+
+from . import Draft
+from .Draft import DraftError
+
+
+class NPZReader(object):
+    """
+    A reader for a binary draft file, as written by NPZWriter.
+
+    The file is a numpy .npz archive with one member per thread column
+    (warp_color, weft_shafts ...) and a json 'header' member for everything else.
+
+    Args:
+        filename (str): the npz filename
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+
+    def read(self):
+        """
+        Perform the actual parsing, and return a Draft instance.
+
+        Returns:
+            Draft: the loaded draft
+        """
+        with np.load(self.filename, allow_pickle=False) as archive:
+            if 'header' not in archive.files:
+                raise DraftError("%s: not a draft file" % self.filename)
+            header = json.loads(archive['header'].tobytes().decode('utf-8'))
+            columns = {}
+            for axis in ('warp', 'weft'):
+                prefix = axis + '_'
+                columns[axis] = dict((name[len(prefix):], archive[name])
+                                     for name in archive.files if name.startswith(prefix))
+        return Draft.from_arrays(header, columns['warp'], columns['weft'])
+
+
+class NPZWriter(object):
+    """
+    A binary draft writer. Stores one repeat of each thread column as a numpy array,
+    and the rest as json.
+     - the drawdown is not stored, it follows from the threading and lifts, so the
+       file grows with the number of threads, not of drawdown cells.
+
+    Args:
+        draft (Draft): the draft to write
+    """
+
+    def __init__(self, draft):
+        self.draft = draft
+
+    def write(self, filename, compressed=False):
+        """
+        Write the draft to filename.
+
+        Args:
+            filename (str): the npz filename, numpy adds .npz if missing.
+            compressed (bool, optional): store the arrays compressed.
+        """
+        header = json.dumps(self.draft.header(), ensure_ascii=False).encode('utf-8')
+        arrays = {'header': np.frombuffer(header, dtype=np.uint8)}
+        for axis in ('warp', 'weft'):
+            for name, column in self.draft.thread_arrays(axis).items():
+                arrays[axis + '_' + name] = column
+        (np.savez_compressed if compressed else np.savez)(filename, **arrays)
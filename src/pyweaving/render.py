@@ -3,7 +3,8 @@ import os.path
 import svgwrite
 from PIL import Image, ImageDraw, ImageFont
 from math import floor
-from . import get_project_root, WHITE, BLACK, MID, WarpThread, find_mirrors_repeats, prune_pattern
+import numpy as np
+from . import get_project_root, WHITE, BLACK, MID, WarpThread, Floats, find_mirrors_repeats, prune_pattern
 from io import BytesIO
 
 homedir = get_project_root()
@@ -28,6 +29,7 @@ def get_text_dimensions(text_string, font):
 def calculate_box_sizing(draft, style):
     """
     To speed up drawing images with variable spacing we cache on each thread a precalculated yarn_width.
+     - Also builds the Draft's position index (prefix sums of yarn_width).
      - Two modes - Clarity and accuracy
      - Clarity uses the clarity value defined in a Drawstyle
      - Accuracy mode will disable tickmarks
@@ -37,7 +39,7 @@ def calculate_box_sizing(draft, style):
     Future:
         When we have EPI/PPI input then will need updating to use that when 'asfabric' set
     """
-    all_spacings = draft.thread_stats["summary"]
+    all_spacings = draft.thread_counts["summary"]
     basicbox = style.box_size
     clarity_factor = style.clarity_factor
     sizing = []
@@ -76,6 +78,8 @@ def calculate_box_sizing(draft, style):
             thread.yarn_width = basicbox
         for thread in draft.weft:
             thread.yarn_width = basicbox
+    # prefix sums of yarn_width for fast float positions
+    draft.build_position_index()
     return sizing
 
 
@@ -103,13 +107,14 @@ class ImageRenderer(object):
     # - Add option to rotate orientation
     # - Add option to render selvedge continuity
 
-    def __init__(self, draft, style, show_liftplan=False, show_structure=False):
+    def __init__(self, draft, style, show_liftplan=False, show_structure=False, float_heatmap=0):
 
         self.draft = draft
         self.style = style
 
         self.show_liftplan = show_liftplan   # force liftplan display
         self.show_structure = show_structure
+        self.float_heatmap = float_heatmap   # tile size of the long float overlay, 0 for none
 
         self.border_pixels = style.border_pixels
         self.pixels_per_square = style.box_size
@@ -228,6 +233,8 @@ class ImageRenderer(object):
         # Drawdown
         drawdownstart = (heddleend[0], threadingend[1] + self.style.drawdown_gap)
         drawdownend = self.paint_drawdown(drawdownstart, draw)
+        if self.float_heatmap:
+            self.paint_float_heatmap(drawdownstart, im)
         self.paint_start_indicator(drawdownstart, warp_area_length, draw)
 
         # Notes
@@ -350,6 +357,41 @@ class ImageRenderer(object):
                       line, align='left', font=self.tick_font, fill=BLACK.rgb)
         return (endwidth, endheight)
 
+    def paint_float_heatmap(self, startpos, im):
+        """
+        Component: Shade the drawdown by the longest float in each tile, from draft.float_heatmap().
+         - Tiles are float_heatmap threads square, the longest floats are the most opaque.
+         - Do not return sizing as it lies over the drawdown.
+
+        Args:
+            startpos (tuple X,Y): starting position of the drawdown.
+            im (Image): Draw into this image.
+        """
+        tile = self.float_heatmap
+        heatmap = self.draft.float_heatmap(tile)
+        if not heatmap.size or not heatmap.max():
+            return
+        offsetx, offsety = startpos
+        offsetx *= self.pixels_per_square
+        offsety *= self.pixels_per_square
+        index = self.draft.position_index
+        # edges of the tiles, the last ones may be short. Warp is drawn right to left
+        warp_edges = index["warp_edges"][np.minimum(np.arange(heatmap.shape[0] + 1) * tile, len(self.draft.warp))]
+        warp_edges = (warp_edges[-1] - warp_edges).tolist()
+        weft_edges = index["weft_edges"][np.minimum(np.arange(heatmap.shape[1] + 1) * tile, len(self.draft.weft))]
+        weft_edges = weft_edges.tolist()
+        alpha = (heatmap * 160 // heatmap.max()).tolist()
+        red, green, blue = self.style.floats_color.rgb
+        overlay = Image.new('RGBA', im.size, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(overlay)
+        for i, row in enumerate(alpha):
+            for j, opacity in enumerate(row):
+                if opacity:
+                    draw.rectangle((offsetx + warp_edges[i + 1], offsety + weft_edges[j],
+                                    offsetx + warp_edges[i] - 1, offsety + weft_edges[j + 1] - 1),
+                                   fill=(red, green, blue, opacity))
+        im.paste(overlay, (0, 0), overlay)
+
     def paint_start_indicator(self, startpos, weft_length, draw):
         """
         Component: Draw an indicator of where to start weaving.
@@ -701,6 +743,7 @@ class ImageRenderer(object):
 
         endy = offsety * self.pixels_per_square  # steps down along the weft
         previous = endy
+        lifts = self.draft.lift_masks()
         index = 0
         while index != len(self.draft.weft):
             thread = self.draft.weft[index]
@@ -709,13 +752,13 @@ class ImageRenderer(object):
             else:
                 endy += self.style.box_size
 
-            for jj, shaft in enumerate(self.draft.shafts):
+            for jj in range(len(self.draft.shafts)):
                 startx = (jj + offsetx) * self.pixels_per_square
                 endx = startx + self.pixels_per_square
                 draw.rectangle((startx, previous, endx, endy),
                                outline=self.outline_color.rgb)
 
-                if shaft in thread.connected_shafts:
+                if lifts[index] >> jj & 1:
                     # draw liftplan marker
                     if self.style.weft_use_thread_color:
                         bgcolor = thread.color
@@ -772,21 +815,22 @@ class ImageRenderer(object):
 
         num_treadles = len(self.draft.treadles)
         num_shafts = len(self.draft.shafts)
+        tieup = self.draft.tieup_masks()
 
-        for ii, treadle in enumerate(self.draft.treadles):
+        for ii in range(num_treadles):
             startx = (ii + offsetx) * self.pixels_per_square
             endx = startx + self.pixels_per_square
 
             treadle_no = ii + 1
 
-            for jj, shaft in enumerate(self.draft.shafts):
+            for jj in range(len(self.draft.shafts)):
                 starty = (num_shafts - jj + start_tieup_y) * self.pixels_per_square
                 endy = starty + self.pixels_per_square
 
                 draw.rectangle((startx, starty, endx, endy),
                                outline=self.outline_color.rgb)
 
-                if shaft in treadle.shafts:
+                if tieup[ii] >> jj & 1:
                     if self.style.tieup_style == 'number':
                         label = str(jj + 1)
                     self.paint_fill_marker(draw, (startx, starty, endx, endy), self.style.boxfill_color, self.style.tieup_style, label, None)
@@ -932,8 +976,10 @@ class ImageRenderer(object):
         # shading prep
         indent = self.style.interlace_width  # how much indent in the interlace style
         # BG fills in gaps when interlacing
-        drawdown_width = sum([t.yarn_width for t in self.draft.warp])
-        drawdown_height = sum([t.yarn_width for t in self.draft.weft])
+        rects = self.draft.float_rectangles(floats, self.pixels_per_square).tolist()
+        index = self.draft.position_index
+        drawdown_width = index["warp_edges"][-1]
+        drawdown_height = index["weft_edges"][-1]
         draw.rectangle((offsetx + indent - 1, offsety + indent - 1,
                        offsetx + drawdown_width, offsety + drawdown_height),
                        fill=outline_color)
@@ -942,10 +988,9 @@ class ImageRenderer(object):
         so2 = max(1, self.pixels_per_square // 10)
         so1 = max(1, so2 // 2)
 
-        for start, end, visible, length, thread in floats:
+        for (start, end, visible, length, thread), realpos in zip(floats, rects):
             if visible == front:  # visible is front of fabric. If front is false - show back of fabric
-                realpos = self.draft.get_position(thread, start, end, self.pixels_per_square, True)  # !! True also front or !front
-                (startx, starty), (endx, endy) = realpos
+                startx, starty, endx, endy = realpos
                 startx += offsetx
                 starty += offsety
                 endx += offsetx
@@ -1270,6 +1315,7 @@ class SVGRenderer(object):
                                     # debug=True) # True when developing but very very slow to save
                                     debug=False)
         # create styles
+        self.draft.assign_all_css_labels()
         self.create_CSS_styles(self.draft.css_colors, self.style.box_vec_stroke)
 
         # Layout
@@ -1729,6 +1775,7 @@ class SVGRenderer(object):
 
         endy = offsety * self.pixels_per_square  # steps down along the weft
         previous = endy
+        lifts = self.draft.lift_masks()
         index = 0
         while index != len(self.draft.weft):
             thread = self.draft.weft[index]
@@ -1737,13 +1784,13 @@ class SVGRenderer(object):
             else:
                 endy += self.style.box_size
 
-            for jj, shaft in enumerate(self.draft.shafts):
+            for jj in range(len(self.draft.shafts)):
                 startx = (jj + offsetx) * self.pixels_per_square
                 endx = startx + self.pixels_per_square
                 grp.add(self.dwg.rect(insert=(startx, previous), size=(self.pixels_per_square, endy-previous),
                                       class_="box"))
 
-                if shaft in thread.connected_shafts:
+                if lifts[index] >> jj & 1:
                     # draw liftplan marker
                     if self.style.weft_use_thread_color:
                         bgcolor = thread
@@ -1798,21 +1845,22 @@ class SVGRenderer(object):
 
         num_treadles = len(self.draft.treadles)
         num_shafts = len(self.draft.shafts)
+        tieup = self.draft.tieup_masks()
 
-        for ii, treadle in enumerate(self.draft.treadles):
+        for ii in range(num_treadles):
             startx = (ii + offsetx) * self.pixels_per_square
             endx = startx + self.pixels_per_square
 
             treadle_no = ii + 1
 
-            for jj, shaft in enumerate(self.draft.shafts):
+            for jj in range(len(self.draft.shafts)):
                 starty = (num_shafts - jj + start_tieup_y) * self.pixels_per_square
                 endy = starty + self.pixels_per_square
 
                 grp.add(self.dwg.rect(insert=(startx, starty), size=(self.pixels_per_square, self.pixels_per_square),
                                       class_="box"))
 
-                if shaft in treadle.shafts:
+                if tieup[ii] >> jj & 1:
                     if self.style.tieup_style == 'number':
                         label = str(jj + 1)
                     self.paint_fill_marker(grp, (startx, starty, endx, endy), "css_boxfill_color", self.style.tieup_style, label, None)
@@ -1935,6 +1983,7 @@ class SVGRenderer(object):
         """
 
         floats = self.draft.computed_floats
+        rects = self.draft.float_rectangles(floats, self.pixels_per_square).tolist()
         float_cutoff = self.style.floats_count
         show_float = self.style.show_floats
 
@@ -1947,17 +1996,21 @@ class SVGRenderer(object):
         # shading prep
         indent = self.style.interlace_width  # how much indent in the interlace style
         hash = 0
-        hashes = []
+        hashes = set()
+        # css hash and label of every thread, looked up once rather than for each float
+        css_hashes = ([thread.css_hash for thread in self.draft.warp], [thread.css_hash for thread in self.draft.weft])
+        css_labels = ([thread.css_label for thread in self.draft.warp], [thread.css_label for thread in self.draft.weft])
 
         # shading offset - used when drawing the shadow and highlight thread features
         so = self.style.vector_shading_width
         vstroke = self.style.box_vec_stroke
         iw = self.style.interlace_width
 
-        for start, end, visible, length, thread in floats:
+        for axis, index, visible, length, realpos in zip(floats.axis.tolist(), floats.thread.tolist(),
+                                                         floats.visible.tolist(), floats.length.tolist(), rects):
             if visible == front:  # visible is front of fabric. If front is false - show back of fabric
-                realpos = self.draft.get_position(thread, start, end, self.pixels_per_square, True)  # !! True also front or !front
-                (startx, starty), (endx, endy) = realpos
+                is_warp = axis == Floats.WARP
+                startx, starty, endx, endy = realpos
                 startx += offsetx
                 starty += offsety
                 endx += offsetx
@@ -1965,27 +2018,26 @@ class SVGRenderer(object):
 
                 # Calculate hashing number for unique yarn symbol
                 # warp=+1, weft=+0, real_length*10, color/spacing hash*1000, visible = *-1
-                if isinstance(thread, WarpThread):
+                if is_warp:
                     hash = 1
                     hash += (endy-starty) * 10
                 else:  # weft
                     hash = 0
                     hash += (endx-startx) * 10
-                hash += thread.css_hash * 1000
+                hash += css_hashes[axis][index] * 1000
                 if visible != front:
                     hash *= -1
                 hashid = "th%d" % (hash)
-                defsgrp = self.dwg.g(id=hashid)  # structure each under a group
 
                 # setup css_style (thread color)
                 if self.show_structure:
                     # Use warp=black, weft=white
-                    if isinstance(thread, WarpThread):
+                    if is_warp:
                         css_style = "css_boxblack"
                     else:
                         css_style = "css_boxwhite"
                 else:  # use the thread colors
-                    css_style = thread.css_label  # thread color
+                    css_style = css_labels[axis][index]  # thread color
                 # highlight the long floats
                 if show_float and length >= float_cutoff:
                     css_style = "floats"
@@ -1998,7 +2050,8 @@ class SVGRenderer(object):
                 if 'solid' in self.style.drawdown_style:
                     # remove stroke from class by using 'flat' version
                     if hashid not in hashes:
-                        hashes.append(hashid)
+                        hashes.add(hashid)
+                        defsgrp = self.dwg.g(id=hashid)  # structure each under a group
                         defsgrp.add(self.dwg.rect(insert=(0, 0), size=(endx - 1 - startx, endy - 1 - starty),
                                                   class_=css_style + "flat"))
                         if 'shade' in self.style.drawdown_style:
@@ -2020,7 +2073,8 @@ class SVGRenderer(object):
 
                 elif 'box' in self.style.drawdown_style:
                     if hashid not in hashes:
-                        hashes.append(hashid)
+                        hashes.add(hashid)
+                        defsgrp = self.dwg.g(id=hashid)  # structure each under a group
                         defsgrp.add(self.dwg.rect(insert=(0, 0), size=(endx - startx, endy - starty),
                                                   class_=css_style))
                         if 'shade' in self.style.drawdown_style:
@@ -2041,7 +2095,7 @@ class SVGRenderer(object):
                     grp.add(self.dwg.use(href="#"+hashid, insert=(startx, starty)))
 
                 elif 'interlace' in self.style.drawdown_style:
-                    if isinstance(thread, WarpThread):
+                    if is_warp:
                         boxx1 = startx + indent
                         boxx2 = endx - indent
                         boxy1 = starty - indent
@@ -2053,7 +2107,8 @@ class SVGRenderer(object):
                         boxx2 = endx + indent
                     #
                     if hashid not in hashes:
-                        hashes.append(hashid)
+                        hashes.add(hashid)
+                        defsgrp = self.dwg.g(id=hashid)  # structure each under a group
                         defsgrp.add(self.dwg.rect(insert=(0, 0), size=(boxx2 - boxx1, boxy2 - boxy1),
                                     class_=css_style))
                         defsgrp.add(self.dwg.line((0, 0), (boxx2 - boxx1, 0),
@@ -0,0 +1,198 @@
+#!/usr/bin/python
+
+# Run length encoded threading, treadling and color orders
+
+import numpy as np
+
+
+def _same(value, other):
+    " value equality that also allows None against a Color "
+    return value is other or (value is not None and other is not None and value == other)
+
+
+class RunSequence(object):
+    """
+    A sequence of values held as runs, for threadings, treadlings and color orders,
+    which are mostly straight draws, points and repeats.
+     - Each run is (first value, step, count): step 0 repeats one value, step 1 or -1
+       is a straight draw up or down the shafts.
+     - Values are ints (zero based shaft, treadle, -1 for none) or, in step 0 runs,
+       any other value such as a Color.
+     - The runs are followed `repeats` times without being stored again.
+
+    Repeating, reversing and shifting work on the runs, the values are only
+    expanded by iterating or by array().
+
+    Args:
+        runs (iterable, optional): of (value, step, count) tuples,
+        repeats (int, optional): number of times the runs are repeated.
+    """
+    __slots__ = ('runs', 'repeats', '_unit')
+
+    def __init__(self, runs=(), repeats=1):
+        self.runs = tuple((value, step, count) for value, step, count in runs if count > 0)
+        self.repeats = repeats
+        self._unit = sum(count for value, step, count in self.runs)
+
+    @classmethod
+    def from_values(cls, values, repeats=1):
+        """
+        Compress values into runs of equal values and straight draws (step 1 or -1).
+
+        Args:
+            values (iterable): the values of one repeat,
+            repeats (int, optional): number of times they are repeated.
+        """
+        runs = []
+        for value in values:
+            if isinstance(value, np.integer):
+                value = int(value)
+            if runs:
+                first, step, count = runs[-1]
+                if count == 1 and isinstance(value, int) and isinstance(first, int) and \
+                        abs(value - first) <= 1 and (value >= 0) == (first >= 0):
+                    runs[-1] = (first, value - first, 2)
+                    continue
+                if (isinstance(value, int) and 0 <= value == first + step * count) if step else \
+                        _same(value, first):
+                    runs[-1] = (first, step, count + 1)
+                    continue
+            runs.append((value, 0, 1))
+        return cls(runs, repeats)
+
+    @classmethod
+    def straight(cls, first, last):
+        """
+        A straight draw from first to last, inclusive, up or down.
+
+        Args:
+            first (int): first value,
+            last (int): last value.
+        """
+        step = 1 if last >= first else -1
+        return cls([(first, step, abs(last - first) + 1)])
+
+    @classmethod
+    def point(cls, first, last):
+        """
+        A point draw from first to last and back, stopping short of first so that
+        repeats of it join up: point(0, 3) is 0 1 2 3 2 1.
+
+        Args:
+            first (int): value at the start (and end) of the point,
+            last (int): value at the turn.
+        """
+        step = 1 if last >= first else -1
+        return cls([(first, step, abs(last - first) + 1),
+                    (last - step, -step, abs(last - first) - 1)])
+
+    def __len__(self):
+        return self._unit * self.repeats
+
+    def __iter__(self):
+        for ii in range(self.repeats):
+            for value, step, count in self.runs:
+                if step:
+                    for jj in range(count):
+                        yield value + step * jj
+                else:
+                    for jj in range(count):
+                        yield value
+
+    def __eq__(self, other):
+        return isinstance(other, RunSequence) and len(self) == len(other) and list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __add__(self, other):
+        " the values of self followed by those of other "
+        return RunSequence(self.runs * self.repeats + other.runs * other.repeats)
+
+    def __repr__(self):
+        return '<RunSequence %d runs x %d>' % (len(self.runs), self.repeats)
+
+    @property
+    def unit(self):
+        """
+        RunSequence: one repeat of this sequence.
+        """
+        return RunSequence(self.runs)
+
+    def repeat(self, n):
+        """
+        Sequence of these values n times over.
+        """
+        return RunSequence(self.runs, self.repeats * n)
+
+    def reversed(self):
+        """
+        Sequence of these values in reverse order (flipped).
+        """
+        return RunSequence([(value + step * (count - 1) if step else value, -step, count)
+                            for value, step, count in reversed(self.runs)], self.repeats)
+
+    def shift(self, n):
+        """
+        Sequence starting n values further on, the skipped values moving to the end
+        (a cyclic rotation). Repeats stay repeats.
+        """
+        if not self._unit:
+            return self
+        n %= self._unit
+        for ii, (value, step, count) in enumerate(self.runs):
+            if n < count:
+                head = self.runs[:ii] + ((value, step, n),)
+                tail = ((value + step * n if step else value, step, count - n),) + self.runs[ii + 1:]
+                return RunSequence(tail + head, self.repeats)
+            n -= count
+
+    def offset(self, delta, modulo=None):
+        """
+        Sequence with delta added to every int value, e.g. to move a threading up the
+        shafts. Values below zero (none) are left alone.
+
+        Args:
+            delta (int): amount to add,
+            modulo (int, optional): wrap the values into range(modulo), runs are
+                split where they wrap.
+        """
+        runs = []
+        for value, step, count in self.runs:
+            if not isinstance(value, int) or value < 0:
+                runs.append((value, step, count))
+                continue
+            value += delta
+            if modulo is None:
+                runs.append((value, step, count))
+                continue
+            while count:
+                value %= modulo
+                if step > 0:
+                    size = (modulo - 1 - value) // step + 1
+                elif step < 0:
+                    size = value // -step + 1
+                else:
+                    size = count
+                size = min(size, count)
+                runs.append((value, step, size))
+                value += step * size
+                count -= size
+        return RunSequence(runs, self.repeats)
+
+    def array(self, dtype=np.int64):
+        """
+        Expand an int sequence into a numpy array of every value.
+
+        Args:
+            dtype (numpy.dtype, optional): type of the array.
+        Returns:
+            numpy.ndarray: of len(self) values.
+        """
+        if not self.runs:
+            return np.zeros(0, dtype=dtype)
+        first, step, count = (np.array(column, dtype=np.int64) for column in zip(*self.runs))
+        starts = np.cumsum(count) - count
+        within = np.arange(self._unit) - np.repeat(starts, count)
+        values = np.repeat(first, count) + np.repeat(step, count) * within
+        return np.tile(values, self.repeats).astype(dtype)
@@ -560,9 +560,9 @@ class WIFWriter(object):
         config.set('CONTENTS', 'THREADING', True)
         config.add_section('THREADING')
 
-        for ii, thread in enumerate(self.draft.warp, start=1):
-            shaft_string = str(self.draft.shafts.index(thread.shaft) + 1)
-            config.set('THREADING', str(ii), shaft_string)
+        for ii, shaft in enumerate(self.draft.threading_sequence(), start=1):
+            if shaft >= 0:
+                config.set('THREADING', str(ii), str(shaft + 1))
 
     def write_liftplan(self, config):
         """
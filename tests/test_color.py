@@ -1,5 +1,5 @@
 
-from pyweaving import Color, BLACK, WHITE, MID
+from pyweaving import Color, ColorCache, BLACK, WHITE, MID
 
 
 def test_colors():
@@ -17,3 +17,59 @@ def test_colors():
     for col in colors:
         print(col, col.rgb, col.hsl, col.css, col.hex, col.highlight, col.shadow)
 
+
+def test_shared_colors_frozen():
+    cache = ColorCache()
+    red = cache.get((255, 0, 0), True)
+    assert red.frozen and not Color((255, 0, 0)).frozen
+    for name, value in (('hex', '#000000'), ('rgb', (0, 0, 0)), ('as_drawn', (0, 0, 0))):
+        try:
+            setattr(red, name, value)
+        except AttributeError:
+            pass
+        else:
+            assert False, "changed a shared Color"
+    assert cache.get((255, 0, 0), True).rgb == (255, 0, 0)
+    # shading of a frozen Color is still computed
+    assert cache.get((255, 255, 255), True).as_drawn != (255, 255, 255)
+
+
+def test_color_cache():
+    cache = ColorCache()
+    red = cache.get((255, 0, 0), True)
+    # same rgb and shadeable share one Color
+    assert cache.get('#ff0000', True) is red
+    assert cache.get(Color(red), True) is red
+    assert cache.get((255, 0, 0)) is not red
+    assert (cache.hits, cache.misses, len(cache)) == (2, 2, 2)
+    assert hash(red) == hash(cache.get((255, 0, 0)))
+    try:
+        hash(Color((255, 0, 0)))
+    except TypeError:
+        pass
+    else:
+        assert False, "hashed a Color that can change"
+    cache.clear()
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+    # least recently used Colors are dropped past maxsize
+    cache = ColorCache(maxsize=2)
+    grey = cache.get((1, 1, 1))
+    cache.get((2, 2, 2))
+    cache.get((1, 1, 1))
+    cache.get((3, 3, 3))
+    assert len(cache) == 2 and cache.get((1, 1, 1)) is grey
+    assert cache.misses == 3
+    cache.get((2, 2, 2))
+    assert cache.misses == 4
+
+
+def test_lazy_shading():
+    white = Color((255, 255, 255), True)
+    # nothing derived until asked for
+    assert white._highlight is None and white._okhsl is None
+    assert white.highlight == (255, 255, 255)
+    assert white.as_drawn != white.rgb
+    # changing the color recomputes the derived values
+    white.hex = '#000000'
+    assert white.shadow == (0, 0, 0)
+    assert white.hsl == (0, 0, 0)
@@ -1,7 +1,12 @@
 
+import json
+import os
+import tempfile
 from unittest import TestCase
 
-from pyweaving import Draft, Color
+from pyweaving import Draft, Color, Floats, RunSequence
+from pyweaving.generators import twill
+from pyweaving.npz import NPZReader, NPZWriter
 
 
 class TestDraft(TestCase):
@@ -24,3 +29,381 @@ class TestDraft(TestCase):
             color=black,
             shafts=[1],
         )
+
+    def test_drawdown_matrix(self):
+        draft = twill.twill("2/2", 2)
+        matrix = draft.compute_drawdown_matrix()
+        self.assertEqual(matrix.shape, (len(draft.warp), len(draft.weft)))
+        for x, column in enumerate(draft.compute_drawdown()):
+            for y, thread in enumerate(column):
+                self.assertEqual(thread, draft.compute_drawdown_at((x, y)))
+                self.assertEqual(matrix[x, y], thread == draft.warp[x])
+        # 2/2 twill shows warp on half the cells
+        self.assertEqual(matrix.sum(), matrix.size // 2)
+
+    def test_float_arrays(self):
+        draft = twill.twill("2/2", 2)
+        floats = draft.compute_float_arrays()
+        self.assertEqual(len(floats), len(list(draft.compute_floats())))
+        # every float in a 2/2 twill covers two threads, except where cut at the edges
+        self.assertEqual(floats.length.max(), 1)
+        warp_front = floats.select(axis=Floats.WARP, visible=True)
+        self.assertTrue((warp_front.axis == Floats.WARP).all())
+        for start, end, visible, length, thread in warp_front:
+            self.assertEqual(thread, draft.warp[start[0]])
+            self.assertTrue(visible)
+            self.assertEqual(end[1] - start[1], length)
+
+    def test_float_rectangles(self):
+        draft = twill.twill("2/1", 2)
+        for i, thread in enumerate(draft.warp):
+            thread.spacing = 0.1
+            thread.yarn_width = 10 + i % 2
+        for thread in draft.weft:
+            thread.spacing = 0.1
+            thread.yarn_width = 10
+        draft.build_position_index()
+        floats = draft.compute_float_arrays()
+        rects = draft.float_rectangles(floats, 10).tolist()
+        for (start, end, visible, length, thread), rect in zip(floats, rects):
+            (startx, starty), (endx, endy) = draft.get_position(thread, start, end, 10)
+            self.assertEqual(rect, [startx, starty, endx, endy])
+        self.assertEqual(draft.position_index["warp_edges"][-1], 10 * 6 + 3)
+
+    def test_invert_shed(self):
+        draft = twill.twill("2/2", 1)
+        drawdown = draft.compute_drawdown_matrix().copy()
+        draft.invert_shed()
+        self.assertFalse(draft.rising_shed)
+        self.assertTrue((draft.compute_drawdown_matrix() == drawdown).all())
+
+    def test_recolor_shared_color(self):
+        first = twill.twill("2/2", 1)
+        second = twill.twill("2/2", 1)
+        color = first.warp[0].color
+        with self.assertRaises(AttributeError):
+            color.hex = '#000000'
+        first.warp[0].color = (0, 0, 0)
+        self.assertEqual(first.warp[0].color.rgb, (0, 0, 0))
+        self.assertEqual(first.warp[1].color, color)
+        self.assertEqual(second.warp[0].color, color)
+
+    def test_thread_columns(self):
+        draft = Draft(num_shafts=2, num_treadles=2)
+        red = Color((255, 0, 0), True)
+        draft.add_warp_thread(color=red, shaft=draft.shafts[1], spacing=0.1)
+        draft.add_warp_thread(color=(255, 0, 0), shaft=0)
+        draft.add_weft_thread(color="#00ff00", treadles=[draft.treadles[1]])
+        # threads are views onto the draft's columns and share the palette
+        self.assertEqual(len(draft.palette), 2)
+        self.assertIs(draft.warp[0].color, draft.warp[1].color)
+        self.assertIs(draft.warp[0].shaft, draft.shafts[1])
+        self.assertEqual(draft.warp[0].spacing, 0.1)
+        self.assertIsNone(draft.warp[1].spacing)
+        self.assertEqual(draft.weft[0].treadles, {draft.treadles[1]})
+        with self.assertRaises(AttributeError):
+            draft.warp[0].extra = 1
+        # writing through a view updates the draft
+        draft.warp[1].shaft = draft.shafts[1]
+        self.assertEqual([t.shaft for t in draft.warp], [draft.shafts[1]] * 2)
+        draft.flip_weftwise()
+        self.assertEqual(draft.warp[1].spacing, 0.1)
+
+    def test_thread_stats(self):
+        draft = Draft(num_shafts=2)
+        for i in range(6):
+            draft.add_warp_thread(color=(0, 0, 255 - 200 * (i % 2)), shaft=i % 2, spacing=0.1 * (1 + i // 4))
+        for i in range(3):
+            draft.add_weft_thread(color=(0, 0, 255), shafts=[i % 2], spacing=0.1)
+        draft.process_draft()
+        stats = draft.thread_stats
+        self.assertEqual([(c.rgb, s, n) for c, s, n in stats["warp"]],
+                         [((0, 0, 255), 0.1, 2), ((0, 0, 55), 0.1, 2), ((0, 0, 255), 0.2, 1), ((0, 0, 55), 0.2, 1)])
+        self.assertEqual(stats["warp_spacings"], [(0.1, 4), (0.2, 2)])
+        self.assertEqual(stats["summary"], [0.1, 0.2])
+        # weft thread matches the first warp thread
+        self.assertEqual(len(stats["unique_threads"]), 4)
+
+    def test_css_labels(self):
+        draft = twill.twill("2/2", 2)
+        draft.process_draft()
+        # assigned when first used
+        self.assertNotIn('css_colors', draft._derived)
+        draft.assign_all_css_labels()
+        draft.assign_all_css_labels()
+        self.assertEqual(draft.warp[0].css_label, "warpcol0")
+        self.assertEqual(draft.weft[0].css_label, "weftcol0")
+        # labels only need the thread counts, not the drawdown or floats
+        self.assertIsNone(draft._drawdown_matrix)
+        self.assertNotIn('float_summary', draft._derived)
+        self.assertEqual(len(draft.css_colors),
+                         len(draft.thread_stats["warp"]) + len(draft.thread_stats["weft"]))
+
+    def test_lazy_derived(self):
+        draft = twill.twill("2/2", 2)
+        draft.process_draft()
+        # nothing computed until used
+        self.assertIsNone(draft._drawdown_matrix)
+        self.assertEqual(draft.thread_stats["warp_ratio"], 1)
+        floats = draft.computed_floats
+        self.assertIs(draft.computed_floats, floats)
+        # colors do not change the floats, only the stats
+        draft.warp[0].color = (1, 2, 3)
+        self.assertIs(draft.computed_floats, floats)
+        self.assertEqual(len(draft.thread_stats["warp"]), 2)
+        self.assertEqual(draft.collected_notes, draft.collected_notes)
+
+    def test_dirty_tracking(self):
+        draft = twill.twill("2/2", 3)
+        draft.computed_floats
+        count = draft.mutation_count
+        # edits through threads and Draft methods are tracked
+        draft.warp[3].shaft = draft.shafts[0]
+        draft.weft[5].treadles = [draft.treadles[0]]
+        draft.add_warp_thread(color=(0, 0, 0), shaft=1)
+        draft.add_weft_thread(color=(0, 0, 0), treadles=[1])
+        draft.treadles[2].shafts = set(draft.shafts[:1])
+        self.assertGreater(draft.mutation_count, count)
+        floats = draft.computed_floats
+        matrix = draft.compute_drawdown_matrix()
+        fresh = Draft.from_json(draft.to_json())
+        self.assertTrue((matrix == fresh.compute_drawdown_matrix()).all())
+        for name in ("axis", "thread", "start", "end", "visible"):
+            self.assertTrue((getattr(floats, name) == getattr(fresh.compute_float_arrays(), name)).all())
+
+    def test_update_floats(self):
+        draft = twill.twill("2/1 1/2", 4)
+        floats = draft.update_floats()
+        draft.warp[5].shaft = draft.shafts[0]
+        draft.weft[3].treadles = [draft.treadles[1], draft.treadles[2]]
+        updated = draft.update_floats()
+        self.assertIsNot(updated, floats)
+        self.assertIs(draft.computed_floats, updated)
+        full = draft.compute_float_arrays()
+        for name in ("axis", "thread", "start", "end", "visible", "length"):
+            self.assertTrue((getattr(updated, name) == getattr(full, name)).all())
+        self.assertEqual(len(updated.runs(Floats.WARP)[0]), (full.axis == Floats.WARP).sum())
+        # first and last threads, and the older floats left as they were
+        draft.warp[0].shaft = draft.shafts[3]
+        draft.weft[-1].treadles = [draft.treadles[0]]
+        self.assertEqual(draft.update_floats().visible.tolist(), draft.compute_float_arrays().visible.tolist())
+        self.assertEqual(updated.start.tolist(), full.start.tolist())
+
+    def test_float_summary(self):
+        draft = twill.twill("3/1", 2)
+        summary = draft.float_summary
+        self.assertIs(draft.float_summary, summary)
+        # warp shows over 3 wefts on the front and under 1 on the back
+        self.assertEqual(summary.longest(Floats.WARP), 2)
+        self.assertEqual(summary.longest(Floats.WARP, False), 0)
+        self.assertEqual(summary.longest(Floats.WEFT), 0)
+        self.assertEqual(draft.compute_longest_floats(True, True), [2, 0, 0, 2])
+        floats = draft.computed_floats
+        self.assertEqual(summary.histogram(Floats.WEFT, False).sum(),
+                         ((floats.axis == Floats.WEFT) & ~floats.visible).sum())
+        self.assertEqual(summary.warp_count, 3 * summary.weft_count)
+        self.assertEqual(draft.thread_stats["warp_ratio"], summary.warp_ratio)
+
+    def test_float_heatmap(self):
+        draft = twill.twill("3/1", 3)
+        histogram = draft.float_length_histogram()
+        self.assertEqual(histogram['warp'].tolist(), draft.float_summary.histogram(Floats.WARP).tolist())
+        # the front shows warp floats over 3 wefts, between single weft crossings
+        grid = draft.float_length_grid()
+        self.assertEqual(grid.shape, (12, 12))
+        self.assertEqual(grid.max(), 2)
+        self.assertEqual(grid[0].tolist(), [0, 0, 2, 2, 2, 0, 2, 2, 2, 0, 1, 1])
+        heatmap = draft.float_heatmap(5)
+        self.assertEqual(heatmap.shape, (3, 3))
+        self.assertEqual(heatmap[2, 2], grid[10:, 10:].max())
+
+    def test_shaft_masks(self):
+        draft = twill.twill("2/2", 2)
+        treadle = draft.treadles[0]
+        self.assertEqual(treadle.mask, 0b11)
+        self.assertEqual(draft.tieup_masks(), [0b11, 0b110, 0b1100, 0b1001])
+        before = draft.compute_drawdown_matrix().copy()
+        # changes through the set API keep the mask and the drawdown in step
+        treadle.shafts.add(draft.shafts[3])
+        self.assertEqual(treadle.mask, 0b1011)
+        self.assertTrue((draft.compute_drawdown_matrix() != before).any())
+        treadle.shafts -= {draft.shafts[3]}
+        self.assertEqual(treadle.mask, 0b11)
+        self.assertTrue((draft.compute_drawdown_matrix() == before).all())
+        self.assertEqual(draft.copy().treadles[0].mask, 0b11)
+        pick = draft.weft[0]
+        self.assertEqual(pick.connected_mask, 0b11)
+        self.assertEqual(pick.connected_shafts, {draft.shafts[0], draft.shafts[1]})
+        self.assertEqual(draft.lift_masks()[:4], draft.tieup_masks())
+        # bits follow the shafts' positions in the draft, not their numbers
+        draft.shafts.reverse()
+        self.assertEqual(treadle.mask, 0b1100)
+        self.assertEqual(draft.tieup_masks()[0], 0b1100)
+
+    def test_virtual_repeats(self):
+        draft = twill.twill("2/2", 1)
+        copied = draft.copy()
+        draft.repeat(2, virtual=True)
+        copied.repeat(2)
+        self.assertEqual(draft.repeats, (3, 3))
+        self.assertEqual(len(draft._warp['color']), 4)
+        self.assertEqual(len(draft.warp), len(copied.warp))
+        self.assertEqual([t.shaft.index for t in draft.warp], [t.shaft.index for t in copied.warp])
+        self.assertTrue((draft.compute_drawdown_matrix() == copied.compute_drawdown_matrix()).all())
+        self.assertEqual(draft.thread_stats["warp"][0][2], 12)
+        # changing one thread expands the repeats
+        draft.warp[5].shaft = draft.shafts[0]
+        self.assertEqual(draft.repeats, (1, 3))
+        self.assertEqual(draft.warp[1].shaft.index, 2)
+        self.assertEqual(draft.warp[5].shaft.index, 1)
+
+    def test_copy_on_write(self):
+        draft = twill.twill("2/2", 1)
+        draft.compute_drawdown_matrix()
+        copied = draft.copy()
+        # columns are shared until one draft changes them
+        self.assertIs(copied._warp['color'], draft._warp['color'])
+        copied.warp[0].color = (1, 2, 3)
+        self.assertIsNot(copied._warp['color'], draft._warp['color'])
+        self.assertIs(copied._warp['shaft'], draft._warp['shaft'])
+        self.assertEqual(draft.warp[0].color.rgb, (255, 255, 255))
+        self.assertEqual(len(draft.palette), 2)
+        copied.treadles[0].shafts.add(copied.shafts[2])
+        self.assertEqual(draft.treadles[0].mask, 0b11)
+        copied.warp[1].shaft = copied.shafts[0]
+        self.assertEqual(draft.warp[1].shaft.index, 2)
+        self.assertEqual(copied.warp[1].shaft.index, 1)
+        self.assertFalse((draft.compute_drawdown_matrix() == copied.compute_drawdown_matrix()).all())
+
+    def test_json_columns(self):
+        draft = twill.twill("2/1 1/2", 2)
+        original = draft.to_json(version=1)
+        draft.weft[0].color = None
+        text = draft.to_json(run_length=True)
+        obj = json.loads(text)
+        self.assertEqual(obj["version"], 2)
+        # the warp is still stored once, the weft was expanded by the change
+        self.assertEqual(obj["repeats"], [2, 1])
+        self.assertEqual(obj["warp"]["shaft"]["values"], [0, 1, 2, 3, 4, 5])
+        self.assertEqual(obj["weft"]["color"]["values"][0], -1)
+        for copied in (Draft.from_json(text), Draft.from_json(draft.to_json()), Draft.from_json(original)):
+            self.assertTrue((copied.compute_drawdown_matrix() == draft.compute_drawdown_matrix()).all())
+            self.assertEqual([t.spacing for t in copied.warp], [t.spacing for t in draft.warp])
+        self.assertIsNone(Draft.from_json(text).weft[0].color)
+
+    def test_npz(self):
+        draft = twill.twill("2/2 1/3", 3)
+        draft.weft[0].color = None
+        draft.warp[1].spacing = 0.5
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "draft.npz")
+            for compressed in (False, True):
+                NPZWriter(draft).write(filename, compressed)
+                copied = NPZReader(filename).read()
+                self.assertEqual(copied.to_json(), draft.to_json())
+                self.assertEqual(copied.repeats, draft.repeats)
+                self.assertTrue((copied.compute_drawdown_matrix() == draft.compute_drawdown_matrix()).all())
+
+    def test_run_sequences(self):
+        point = RunSequence.point(0, 3)
+        self.assertEqual(list(point.repeat(2)), [0, 1, 2, 3, 2, 1] * 2)
+        self.assertEqual(list(point.reversed()), [1, 2, 3, 2, 1, 0])
+        self.assertEqual(list(point.shift(2)), [2, 3, 2, 1, 0, 1])
+        self.assertEqual(list(point.offset(2, modulo=4)), [2, 3, 0, 1, 0, 3])
+        self.assertEqual(RunSequence.from_values([0, 1, 2, 3, 2, 1, -1, -1]).runs,
+                         ((0, 1, 4), (2, -1, 2), (-1, 0, 2)))
+
+        draft = Draft(num_shafts=4, num_treadles=4)
+        draft.set_threading(point.repeat(3))
+        draft.set_treadling(RunSequence.straight(0, 3).repeat(2))
+        draft.set_color_sequence('warp', RunSequence([((200, 0, 0), 0, 6)]).repeat(3))
+        self.assertEqual(len(draft.warp), 18)
+        self.assertEqual(draft.repeats, (3, 2))
+        self.assertEqual(draft.warp[9].shaft, draft.shafts[3])
+        self.assertEqual(draft.weft[5].treadles, {draft.treadles[1]})
+        self.assertEqual(draft.threading_sequence(), point.repeat(3))
+        self.assertEqual(draft.treadling_sequence().runs, ((0, 1, 4),))
+        self.assertEqual(draft.color_sequence('warp').runs[0][0].rgb, (200, 0, 0))
+
+        # color orders hold Colors (or None) in runs of one value
+        colors = RunSequence([((200, 0, 0), 0, 3), (None, 0, 1), ((0, 0, 200), 0, 2)])
+        self.assertEqual(list(colors.reversed()), [(0, 0, 200)] * 2 + [None] + [(200, 0, 0)] * 3)
+        self.assertEqual(list(colors.shift(1)), [(200, 0, 0)] * 2 + [None] + [(0, 0, 200)] * 2 + [(200, 0, 0)])
+        draft.set_color_sequence('warp', colors.repeat(3))
+        flipped = draft.color_sequence('warp').reversed().shift(2)
+        self.assertEqual([color and color.rgb for color in flipped][:3], [None, (200, 0, 0), (200, 0, 0)])
+
+    def test_fingerprint(self):
+        draft = twill.twill("2/2 1/3", 3)
+        expanded = Draft.from_json(draft.to_json())
+        expanded.materialize()
+        expanded.title = "another"
+        self.assertEqual(expanded.fingerprint(), draft.fingerprint())
+        expanded.warp[0].color = (1, 2, 3)
+        self.assertNotEqual(expanded.fingerprint(), draft.fingerprint())
+        self.assertEqual(expanded.fingerprint(colors=False), draft.fingerprint(colors=False))
+        expanded.treadles[0].shafts = set()
+        self.assertNotEqual(expanded.fingerprint(colors=False), draft.fingerprint(colors=False))
+
+    def test_selvedges(self):
+        draft = twill.twill("2/2", 1)
+        # the last pair of the 4 picks is not checked on the low selvedge
+        self.assertFalse(draft.selvedges_continuous())
+        self.assertEqual(draft.selvedge_failures(True).tolist(), [1, 0, 1, 0, 1])
+        self.assertEqual(draft.selvedge_failures(False).tolist(), [0, 2, 0, 2, 2])
+        ranked = draft.rank_selvedges()
+        self.assertEqual(ranked[0], (0, draft.shafts[1], draft.shafts[0]))
+        self.assertEqual(ranked[-1], (3, draft.shafts[2], draft.shafts[3]))
+        draft.make_selvedges_continuous()
+        self.assertTrue(draft.selvedges_continuous())
+
+    def test_crossings(self):
+        draft = twill.twill("2/2", 2)
+        self.assertEqual(draft.compute_weft_crossings().tolist(), [3, 4] * 4)
+        self.assertEqual(draft.compute_warp_crossings().tolist(), [4, 3] * 4)
+        stats = draft.crossing_stats()
+        self.assertEqual(stats['warp'], {'min': 3, 'max': 4, 'mean': 3.5, 'total': 28})
+        self.assertEqual(stats['interlacement'], 56 / 64)
+
+    def test_detached_threads(self):
+        draft = twill.twill("2/2", 2)
+        self.assertTrue(draft.all_threads_attached())
+        draft.materialize()
+        draft.warp[3].shaft = None
+        draft.weft[2].treadles = set()
+        self.assertFalse(draft.all_threads_attached())
+        detached = draft.detached_threads()
+        self.assertEqual(detached['warp'].tolist(), [3])
+        self.assertEqual(detached['weft'].tolist(), [2])
+
+    def test_rotate(self):
+        draft = twill.twill("2/1 1/2", 2)
+        draft.weft[0].color = (10, 20, 30)
+        drawdown = draft.compute_drawdown_matrix().copy()
+        draft.rotate()
+        self.assertFalse(draft.rising_shed)
+        self.assertEqual(draft.repeats, (1, 2))
+        self.assertEqual(draft.warp[0].color.rgb, (10, 20, 30))
+        self.assertTrue((draft.compute_drawdown_matrix() == ~drawdown.T).all())
+        draft.rotate()
+        self.assertTrue((draft.compute_drawdown_matrix() == drawdown).all())
+
+    def test_reduce(self):
+        draft = Draft(num_shafts=8, num_treadles=8)
+        for ii in range(16):
+            draft.add_warp_thread(shaft=ii % 8)
+        # shafts n and 4 + (n + 1) % 4 always lift together, treadles n and n + 4 are tied alike
+        for ii, treadle in enumerate(draft.treadles):
+            treadle.shafts = {draft.shafts[ii % 4], draft.shafts[4 + (ii + 1) % 4]}
+            draft.add_weft_thread(treadles=[ii])
+        drawdown = draft.compute_drawdown_matrix().copy()
+        draft.reduce_shafts()
+        self.assertEqual(len(draft.shafts), 4)
+        self.assertEqual(draft.warp[5].shaft, draft.shafts[0])
+        draft.reduce_treadles()
+        self.assertEqual(len(draft.treadles), 4)
+        self.assertTrue((draft.compute_drawdown_matrix() == drawdown).all())
+        draft.weft[0].treadles = set(draft.treadles[:2])
+        draft.reduce_active_treadles()
+        self.assertEqual(len(draft.treadles), 5)
+        self.assertTrue(all(len(thread.treadles) == 1 for thread in draft.weft))